@@ -0,0 +1,208 @@
+# Benchmarks - rough timings of algorithms against each other on randomly
+# generated inputs. Call a bench function to print a results table e.g.
+# bench_mst(). Timings use the best of a few runs to cut out noise.
+from graphs import ALUNGraph, AMUNGraph, ALUWGraph
+from path_algorithms import dijkstra_search, HEURISTICS
+from heaps import HEAPS, make_heap
+from search_stats import SearchStats
+import random
+import time
+
+
+# build a random connected undirected weighted graph - a random spanning
+# tree first so every vertex is reachable, then extra random edges
+def random_weighted_graph(vertices, edges, seed=0):
+    """
+    Random connected ALUWGraph with integer vertices and weights.
+    :param vertices: Number of vertices
+    :param edges: Number of edges wanted (at least vertices - 1)
+    :param seed: Random seed so runs can be repeated
+    :return: ALUWGraph
+    """
+    rng = random.Random(seed)
+    graph = ALUWGraph()
+    for v in range(vertices):
+        graph.add_vertex(v)
+    for v in range(1, vertices):
+        graph.add_edge(v, rng.randrange(v), rng.randint(1, 100))
+    for _ in range(max(edges - (vertices - 1), 0)):
+        v1, v2 = rng.randrange(vertices), rng.randrange(vertices)
+        if v1 != v2:
+            graph.add_edge(v1, v2, rng.randint(1, 100))
+
+    return graph
+
+
+# best time in seconds of calling fn(*args) repeat times
+def best_time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+# Prim's (indexed heap) vs Kruskal's (sort + disjoint set) on sparse
+# (e ~ 4v) and dense (e ~ v^2/4) graphs. Kruskal tends to win on sparse
+# graphs, Prim's on dense ones as it never sorts every edge
+def bench_mst(sizes=(1000, 2000, 4000)):
+    print(f"{'graph':<8}{'v':>8}{'e':>10}{'prims':>10}{'kruskal':>10}")
+    for v in sizes:
+        for kind, e in (("sparse", 4 * v), ("dense", v * v // 4)):
+            graph = random_weighted_graph(v, e)
+            print(f"{kind:<8}{v:>8}{e:>10}"
+                  f"{best_time(graph.prims):>10.3f}"
+                  f"{best_time(graph.kruskal):>10.3f}")
+
+
+# build a width x height grid graph with (x, y) coordinates. Each step
+# costs between 1 and 2 so manhattan and euclidean never overestimate
+def random_grid_graph(width, height, seed=0):
+    """
+    Grid shaped ALUWGraph with (x, y) vertices and coordinates.
+    :param width: Number of columns
+    :param height: Number of rows
+    :param seed: Random seed so runs can be repeated
+    :return: ALUWGraph
+    """
+    rng = random.Random(seed)
+    graph = ALUWGraph()
+    for x in range(width):
+        for y in range(height):
+            graph.add_vertex((x, y), (x, y))
+    for x in range(width):
+        for y in range(height):
+            if x + 1 < width:
+                graph.add_edge((x, y), (x + 1, y), rng.uniform(1, 2))
+            if y + 1 < height:
+                graph.add_edge((x, y), (x, y + 1), rng.uniform(1, 2))
+
+    return graph
+
+
+# count vertices expanded (neighbours looked up) by dijkstra vs astar for
+# random start/ goal pairs on a grid
+def bench_astar(size=100, queries=20, seed=0):
+    rng = random.Random(seed)
+    graph = random_grid_graph(size, size, seed)
+    vertices = list(graph.adjacency_list)
+    totals = {"dijkstra": SearchStats(), "euclidean": SearchStats(),
+              "manhattan": SearchStats()}
+
+    for _ in range(queries):
+        start, goal = rng.choice(vertices), rng.choice(vertices)
+        for name, stats in totals.items():
+            estimate = None
+            if name != "dijkstra":
+                def estimate(vertex, h=HEURISTICS[name]):
+                    return h(graph.coordinates[vertex],
+                             graph.coordinates[goal])
+            dijkstra_search(graph._weighted_neighbors, start, [goal],
+                            estimate, stats)
+
+    print(f"{'search':<12}{'avg expanded':>14}{'peak frontier':>15}")
+    for name, stats in totals.items():
+        print(f"{name:<12}{stats.expanded / queries:>14.1f}"
+              f"{stats.peak_frontier:>15}")
+
+
+# adjacency list vs adjacency matrix (bitset rows) at different densities -
+# edge look ups and BFS. Lists win on sparse graphs (less to store and
+# walk), matrices on dense ones (O(1) look ups, BFS a row at a time)
+def bench_representations(vertices=2000, densities=(0.001, 0.01, 0.1, 0.5),
+                          queries=20000, seed=0):
+    rng = random.Random(seed)
+    print(f"{'density':>8}{'edges':>10}{'graph':>8}{'build':>9}"
+          f"{'lookups':>9}{'bfs':>9}")
+    for density in densities:
+        edges = [(rng.randrange(vertices), rng.randrange(vertices)) for _ in
+                 range(int(density * vertices * vertices / 2))]
+        pairs = [(rng.randrange(vertices), rng.randrange(vertices)) for _ in
+                 range(queries)]
+        for name, cls in (("AL", ALUNGraph), ("AM", AMUNGraph)):
+            start = time.perf_counter()
+            graph = cls()
+            for v in range(vertices):
+                graph.add_vertex(v)
+            for v1, v2 in edges:
+                graph.add_edge(v1, v2)
+            build = time.perf_counter() - start
+
+            if cls is ALUNGraph:
+                def lookups():
+                    return [v2 in graph.adjacency_list[v1] for v1, v2 in pairs]
+            else:
+                def lookups():
+                    return [graph.has_edge(v1, v2) for v1, v2 in pairs]
+            print(f"{density:>8}{len(edges):>10}{name:>8}{build:>9.3f}"
+                  f"{best_time(lookups):>9.3f}{best_time(graph.bfs, 0):>9.3f}")
+
+
+# time each heap in heaps.HEAPS on n enqueues, then n operations of each
+# mix - "pop" (dequeue only), "mixed" (half enqueue, half dequeue) and
+# "decrease" (mostly decrease keys, the Dijkstra/ Prim's pattern) - then
+# emptying the heap. Each mix starts from a fresh heap of n items; enqueue
+# and drain are averaged over the mixes. Sizes up to 10^7 work but take
+# minutes in Python
+def bench_heaps(sizes=(10 ** 4, 10 ** 5), seed=0):
+    mixes = {"pop": (0, 1, 0), "mixed": (0.5, 0.5, 0),
+             "decrease": (0.1, 0.1, 0.8)}
+    print(f"{'n':>9}{'heap':>11}{'enqueue':>9}" +
+          "".join(f"{mix:>10}" for mix in mixes) + f"{'drain':>9}")
+    for n in sizes:
+        rng = random.Random(seed)
+        priorities = [rng.random() for _ in range(n)]
+        # operations are picked up front so every heap does the same work:
+        # (0 enqueue, 1 dequeue, 2 decrease key) and a random number
+        plans = {mix: [(rng.choices((0, 1, 2), weights)[0], rng.random())
+                       for _ in range(n)] for mix, weights in mixes.items()}
+        for kind in HEAPS:
+            enqueue = drain = 0
+            results = []
+            for plan in plans.values():
+                heap = make_heap(kind)
+                start = time.perf_counter()
+                for value, priority in enumerate(priorities):
+                    heap.enqueue(value, priority)
+                enqueue += time.perf_counter() - start
+
+                start = time.perf_counter()
+                next_value = n
+                for op, number in plan:
+                    if op == 0:
+                        heap.enqueue(next_value, number)
+                        next_value += 1
+                    elif op == 1:
+                        heap.dequeue()
+                    else:
+                        value = int(number * next_value)
+                        if value in heap:
+                            heap.decrease_key(value, heap.get_priority(
+                                value) * number)
+                results.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                while len(heap):
+                    heap.dequeue()
+                drain += time.perf_counter() - start
+            print(f"{n:>9}{kind:>11}{enqueue / len(plans):>9.3f}" +
+                  "".join(f"{t:>10.3f}" for t in results) +
+                  f"{drain / len(plans):>9.3f}")
+
+
+# Dijkstra (all distances, and one pair on the frozen CSR graph) and Prim's
+# with each heap in heaps.HEAPS on a random graph - e/v sets how many
+# decrease keys there are per dequeue
+def bench_graph_heaps(vertices=20000, edges=(40000, 200000), seed=0):
+    print(f"{'v':>8}{'e':>9}{'heap':>11}{'dijkstra':>10}{'csr':>8}"
+          f"{'prims':>9}")
+    for e in edges:
+        graph = random_weighted_graph(vertices, e, seed)
+        frozen = graph.freeze()
+        for kind in HEAPS:
+            csr = best_time(frozen.dijkstra, 0, vertices - 1, None, kind)
+            print(f"{vertices:>8}{e:>9}{kind:>11}"
+                  f"{best_time(graph.dijkstra_all, 0, None, kind):>10.3f}"
+                  f"{csr:>8.3f}{best_time(graph.prims, kind):>9.3f}")
@@ -4,6 +4,9 @@
 # index
 # Big O for binary heaps is Time: O(log(n)) for insertion and removal.
 # Search is O(n). Space: O(n)
+from itertools import islice
+
+
 # Max Binary Heap - parents always greater than child nodes
 class MaxBH:
     """
@@ -11,32 +14,111 @@ class MaxBH:
     :return: List of elements contained in the heap
     """
     def __init__(self):
-        self.values = [1]
+        self.values = []
 
     def __repr__(self):
         return f"{self.values}"
 
-    # insert a new node at highest left most slot
-    def insert(self, value):
-        self.values.append(value)
-        index = len(self.values) - 1
-        parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
+    # build a heap from any iterable in one go - Floyd's bottom up heapify
+    # sifts each parent down starting from the last one. Most items are
+    # near the bottom and only move a little so this is O(n) rather than
+    # O(n log(n)) for inserting them one at a time
+    @classmethod
+    def from_iterable(cls, iterable):
+        heap = cls()
+        heap.values = list(iterable)
+        heap._heapify()
+        return heap
+
+    # restore the heap order of every item - O(n)
+    def _heapify(self):
+        for index in range(len(self.values) // 2 - 1, -1, -1):
+            self._sift_down(index)
 
-        while parent_index is not None:
-            if value > self.values[parent_index]:
-                self.values[index] = self.values[parent_index]
-                self.values[parent_index] = value
+    # move item at index up until its parent is bigger
+    def _sift_up(self, index):
+        values = self.values
+        value = values[index]
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if value > values[parent_index]:
+                values[index] = values[parent_index]
                 index = parent_index
-                parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
             else:
                 break
+        values[index] = value
+
+    # move item at index down until both children are smaller - children
+    # move up into the gap and the item is written once at the end
+    def _sift_down(self, index):
+        values = self.values
+        length = len(values)
+        value = values[index]
+        while True:
+            child = 2 * index + 1
+            if child >= length:
+                break
+            if child + 1 < length and values[child + 1] > values[child]:
+                child += 1
+            if values[child] > value:
+                values[index] = values[child]
+                index = child
+            else:
+                break
+        values[index] = value
+
+    # insert a new node at highest left most slot
+    def insert(self, value):
+        self.values.append(value)
+        self._sift_up(len(self.values) - 1)
 
         return self.values
 
     # insert multiple nodes
     def insert_all(self, lst):
-        for i in lst:
-            self.insert(i)
+        self.push_many(lst)
+
+    # insert many nodes at once - if there are at least as many new nodes as
+    # old ones the whole heap is rebuilt (O(n)), otherwise each new node is
+    # sifted up (O(k log(n)))
+    def push_many(self, iterable):
+        values = self.values
+        start = len(values)
+        values.extend(iterable)
+        if len(values) - start >= start:
+            self._heapify()
+        else:
+            for index in range(start, len(values)):
+                self._sift_up(index)
+
+        return self.values
+
+    # remove the highest k nodes - returned in order
+    def pop_many(self, k):
+        values = self.values
+        removed = []
+        for _ in range(min(k, len(values))):
+            last = values.pop()
+            if values:
+                removed.append(values[0])
+                values[0] = last
+                self._sift_down(0)
+            else:
+                removed.append(last)
+
+        return removed
+
+    # remove the highest node and insert value in one step - value takes the
+    # root's place and is sifted down (one sift rather than two)
+    def replace(self, value):
+        if not self.values:
+            self.values.append(value)
+            return None
+        removed = self.values[0]
+        self.values[0] = value
+        self._sift_down(0)
+
+        return removed
 
     # return removed item at stated index, default is to remove the root
     def remove(self, start=0):
@@ -46,26 +128,8 @@ class MaxBH:
             return self.values.pop()
 
         node_removed = self.values[start]
-        end_node = self.values.pop()
-        self.values[start] = end_node
-
-        index = start
-
-        while True:
-            left = 2 * index + 1 if 2 * index + 1 < len(self.values) else None
-            right = 2 * index + 2 if 2 * index + 2 < len(self.values) else None
-            if left and end_node < self.values[left] or right and end_node < \
-                    self.values[right]:
-                if not right or self.values[left] >= self.values[right]:
-                    self.values[index] = self.values[left]
-                    self.values[left] = end_node
-                    index = left
-                else:
-                    self.values[index] = self.values[right]
-                    self.values[right] = end_node
-                    index = right
-            else:
-                break
+        self.values[start] = self.values.pop()
+        self._sift_down(start)
 
         return node_removed
 
@@ -82,27 +146,106 @@ class MinBH:
     def __repr__(self):
         return f"{self.values}"
 
-    # insert a new node at highest left most slot
-    def insert(self, value):
-        self.values.append(value)
-        index = len(self.values) - 1
-        parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
+    # build a heap from any iterable in one go - Floyd's bottom up heapify
+    # sifts each parent down starting from the last one. Most items are
+    # near the bottom and only move a little so this is O(n) rather than
+    # O(n log(n)) for inserting them one at a time
+    @classmethod
+    def from_iterable(cls, iterable):
+        heap = cls()
+        heap.values = list(iterable)
+        heap._heapify()
+        return heap
 
-        while parent_index is not None:
-            if value < self.values[parent_index]:
-                self.values[index] = self.values[parent_index]
-                self.values[parent_index] = value
+    # restore the heap order of every item - O(n)
+    def _heapify(self):
+        for index in range(len(self.values) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    # move item at index up until its parent is smaller
+    def _sift_up(self, index):
+        values = self.values
+        value = values[index]
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if value < values[parent_index]:
+                values[index] = values[parent_index]
                 index = parent_index
-                parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
             else:
                 break
+        values[index] = value
+
+    # move item at index down until both children are bigger - children
+    # move up into the gap and the item is written once at the end
+    def _sift_down(self, index):
+        values = self.values
+        length = len(values)
+        value = values[index]
+        while True:
+            child = 2 * index + 1
+            if child >= length:
+                break
+            if child + 1 < length and values[child + 1] < values[child]:
+                child += 1
+            if values[child] < value:
+                values[index] = values[child]
+                index = child
+            else:
+                break
+        values[index] = value
+
+    # insert a new node at highest left most slot
+    def insert(self, value):
+        self.values.append(value)
+        self._sift_up(len(self.values) - 1)
 
         return self.values
 
     # insert multiple nodes
     def insert_all(self, lst):
-        for i in lst:
-            self.insert(i)
+        self.push_many(lst)
+
+    # insert many nodes at once - if there are at least as many new nodes as
+    # old ones the whole heap is rebuilt (O(n)), otherwise each new node is
+    # sifted up (O(k log(n)))
+    def push_many(self, iterable):
+        values = self.values
+        start = len(values)
+        values.extend(iterable)
+        if len(values) - start >= start:
+            self._heapify()
+        else:
+            for index in range(start, len(values)):
+                self._sift_up(index)
+
+        return self.values
+
+    # remove the lowest k nodes - returned in order
+    def pop_many(self, k):
+        values = self.values
+        removed = []
+        for _ in range(min(k, len(values))):
+            last = values.pop()
+            if values:
+                removed.append(values[0])
+                values[0] = last
+                self._sift_down(0)
+            else:
+                removed.append(last)
+
+        return removed
+
+    # remove the lowest node and insert value in one step - value takes the
+    # root's place and is sifted down (one sift rather than two)
+    def replace(self, value):
+        if not self.values:
+            self.values.append(value)
+            return None
+        removed = self.values[0]
+        self.values[0] = value
+        self._sift_down(0)
+
+        return removed
 
     # return removed item at stated index, default is to remove the root
     def remove(self, start=0):
@@ -112,25 +255,85 @@ class MinBH:
             return self.values.pop()
 
         node_removed = self.values[start]
-        end_node = self.values.pop()
-        self.values[start] = end_node
+        self.values[start] = self.values.pop()
+        self._sift_down(start)
 
-        index = start
+        return node_removed
 
-        while True:
-            left = 2 * index + 1 if 2 * index + 1 < len(self.values) else None
-            right = 2 * index + 2 if 2 * index + 2 < len(self.values) else None
-            if left and end_node > self.values[left] or right and end_node > \
-                    self.values[right]:
-                if not right or self.values[left] <= self.values[right]:
-                    self.values[index] = self.values[left]
-                    self.values[left] = end_node
-                    index = left
-                else:
-                    self.values[index] = self.values[right]
-                    self.values[right] = end_node
-                    index = right
-            else:
-                break
 
-        return node_removed
+# Top k - the k largest items of any iterable (e.g. a huge stream) using a
+# min heap of only k items: its root is the smallest item kept so far, so
+# a new item is only kept if it beats the root, replacing it. Time:
+# O(n log(k)), Space: O(k). Items are stored as (key, position, item) so
+# items themselves are never compared and ties keep the earlier item
+def nlargest(k, iterable, key=None):
+    """
+    The k largest items of an iterable, largest first.
+    :param k: Number of items wanted
+    :param iterable: Any iterable - read once, never held in memory
+    :param key: Optional function giving the value to compare items by
+    :return: List of up to k items
+    """
+    if k <= 0:
+        return []
+    entries = ((item if key is None else key(item), -i, item) for i, item
+               in enumerate(iterable))
+    heap = MinBH.from_iterable(islice(entries, k))
+    for entry in entries:
+        if entry > heap.values[0]:
+            heap.replace(entry)
+
+    return [entry[2] for entry in reversed(heap.pop_many(k))]
+
+
+# the k smallest items - same as nlargest but keeping a max heap of the
+# k smallest items seen so far
+def nsmallest(k, iterable, key=None):
+    """
+    The k smallest items of an iterable, smallest first.
+    :param k: Number of items wanted
+    :param iterable: Any iterable - read once, never held in memory
+    :param key: Optional function giving the value to compare items by
+    :return: List of up to k items
+    """
+    if k <= 0:
+        return []
+    entries = ((item if key is None else key(item), i, item) for i, item
+               in enumerate(iterable))
+    heap = MaxBH.from_iterable(islice(entries, k))
+    for entry in entries:
+        if entry < heap.values[0]:
+            heap.replace(entry)
+
+    return [entry[2] for entry in reversed(heap.pop_many(k))]
+
+
+# K-way merge - lazily merge already sorted iterables into one sorted
+# stream. A min heap holds the next item of each run; the smallest is
+# yielded and replaced by the next item from the same run. Time:
+# O(n log(k)) for k runs, Space: O(k). Equal items come out in run order
+def kmerge(*iterables, key=None):
+    """
+    Merge sorted iterables into one sorted generator.
+    :param iterables: Iterables each sorted smallest first (by key)
+    :param key: Optional function giving the value to compare items by
+    :return: Generator of every item, smallest first
+    """
+    heap = MinBH()
+    for run, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.insert((item if key is None else key(item), run, item,
+                         iterator))
+            break
+
+    values = heap.values
+    while values:
+        _, run, item, iterator = values[0]
+        yield item
+        for item in iterator:
+            heap.replace((item if key is None else key(item), run, item,
+                          iterator))
+            break
+        else:
+            heap.remove()
@@ -0,0 +1,242 @@
+# Centrality - scores saying how important each vertex of a graph is.
+# Every function works on a graph stored as flat CSR arrays (see
+# graphs.CSRGraph): the edges of vertex i are targets[offsets[i]:
+# offsets[i + 1]] with matching weights (None = every edge weighs 1).
+# Scores come back as an array of floats indexed by vertex id. Inner loops
+# run over whole array slices with built-ins (sum, map) rather than one
+# Python statement per edge wherever the algorithm allows.
+# - Degree: share of the other vertices a vertex is joined to. O(v + e)
+# - Closeness: how near a vertex is to everything else. O(v (v + e))
+# - Betweenness (Brandes): how many shortest paths pass through a vertex.
+#   O(v e) unweighted, O(v e log(v)) weighted - sample sources to trade
+#   accuracy for time on big graphs.
+# - PageRank: chance a random surfer following edges (jumping anywhere
+#   with probability 1 - damping) is at a vertex. Power iteration, O(e) a
+#   round until the ranks stop changing.
+from priority_queue import CompactMinPQ
+from path_algorithms import csr_distances
+from array import array
+from operator import mul, sub
+import math
+
+
+# transpose (reverse every edge of) a CSR graph using a counting sort -
+# the edges into vertex i become the edges out of it. O(v + e)
+def transpose(offsets, targets, weights=None):
+    """
+    Reverse every edge of a CSR graph.
+    :param offsets: Start of each vertex's edges in targets (length v + 1)
+    :param targets: Target vertex id of each edge
+    :param weights: Optional weight of each edge
+    :return: Tuple (offsets, targets, weights) of the reversed graph
+    """
+    n = len(offsets) - 1
+    counts = array("q", [0]) * (n + 1)
+    for t in targets:
+        counts[t + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+
+    reverse_offsets = array("q", counts)
+    reverse_targets = array(targets.typecode, [0]) * len(targets)
+    reverse_weights = None if weights is None else \
+        array("d", [0]) * len(targets)
+    for u in range(n):
+        for j in range(offsets[u], offsets[u + 1]):
+            t = targets[j]
+            position = counts[t]
+            counts[t] = position + 1
+            reverse_targets[position] = u
+            if weights is not None:
+                reverse_weights[position] = weights[j]
+
+    return reverse_offsets, reverse_targets, reverse_weights
+
+
+def degree_centrality(offsets, targets, direction="out"):
+    """
+    Degree centrality - degree divided by the number of other vertices.
+    :param offsets: Start of each vertex's edges in targets (length v + 1)
+    :param targets: Target vertex id of each edge
+    :param direction: "out", "in" or "all" (in + out) edges to count
+    :return: Array of scores indexed by vertex id
+    """
+    if direction not in ("out", "in", "all"):
+        raise ValueError(f"Unknown direction {direction!r}.")
+    n = len(offsets) - 1
+    degrees = array("d", [0]) * n
+    if direction != "in":
+        degrees = array("d", map(sub, offsets[1:], offsets[:-1]))
+    if direction != "out":
+        for t in targets:
+            degrees[t] += 1
+
+    scale = 1 / (n - 1) if n > 1 else 0
+    return array("d", [d * scale for d in degrees])
+
+
+def closeness_centrality(offsets, targets, weights=None, directed=True):
+    """
+    Closeness centrality - (reachable - 1) / total distance from the
+    vertices which can reach it, scaled by the share of the graph they
+    make up (so small separate components do not score highly). Directed
+    graphs use distances into each vertex.
+    :param offsets: Start of each vertex's edges in targets (length v + 1)
+    :param targets: Target vertex id of each edge
+    :param weights: Optional weight of each edge (None = edge count)
+    :param directed: False if every edge is stored both ways
+    :return: Array of scores indexed by vertex id
+    """
+    n = len(offsets) - 1
+    if directed:
+        offsets, targets, weights = transpose(offsets, targets, weights)
+
+    scores = array("d", [0]) * n
+    for v in range(n):
+        reached = [d for d in csr_distances(offsets, targets, weights, v)
+                   if d != math.inf]
+        total = sum(reached)
+        if total > 0 and n > 1:
+            r = len(reached) - 1
+            scores[v] = r / total * r / (n - 1)
+
+    return scores
+
+
+def betweenness_centrality(offsets, targets, weights=None, directed=True,
+                           normalized=True, sources=None):
+    """
+    Betweenness centrality using Brandes' algorithm - one search per source
+    counts the shortest paths to every vertex then walks back from the
+    furthest vertex adding up each vertex's share of the paths through it.
+    :param offsets: Start of each vertex's edges in targets (length v + 1)
+    :param targets: Target vertex id of each edge
+    :param weights: Optional weight of each edge (None = edge count)
+    :param directed: False if every edge is stored both ways
+    :param normalized: Divide by the number of vertex pairs
+    :param sources: Optional vertex ids to search from - an estimate
+    scaled up to the whole graph
+    :return: Array of scores indexed by vertex id
+    """
+    n = len(offsets) - 1
+    scores = array("d", [0]) * n
+    sources = range(n) if sources is None else list(sources)
+
+    for s in sources:
+        if weights is None:
+            order, sigma, distances = _brandes_bfs(offsets, targets, s, n)
+        else:
+            order, sigma, distances = _brandes_dijkstra(offsets, targets,
+                                                        weights, s, n)
+        # successors of v on shortest paths are edges which stay tight
+        delta = [0.0] * n
+        for v in reversed(order):
+            dv = distances[v]
+            total = 0.0
+            for j in range(offsets[v], offsets[v + 1]):
+                w = targets[j]
+                if distances[w] == dv + (1 if weights is None else
+                                         weights[j]) and sigma[w]:
+                    total += (1 + delta[w]) / sigma[w]
+            delta[v] = sigma[v] * total
+            if v != s:
+                scores[v] += delta[v]
+
+    if normalized:
+        scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 0
+    else:
+        scale = 1 if directed else 0.5
+    if len(sources) and len(sources) < n:
+        scale *= n / len(sources)
+
+    return array("d", [x * scale for x in scores])
+
+
+# BFS from s counting shortest paths - returns the vertices in the order
+# reached, path counts and edge count distances
+def _brandes_bfs(offsets, targets, s, n):
+    sigma = [0] * n
+    distances = [math.inf] * n
+    sigma[s], distances[s] = 1, 0
+    order = [s]
+    for v in order:
+        dv = distances[v] + 1
+        sv = sigma[v]
+        for w in targets[offsets[v]:offsets[v + 1]]:
+            if distances[w] == math.inf:
+                distances[w] = dv
+                order.append(w)
+            if distances[w] == dv:
+                sigma[w] += sv
+
+    return order, sigma, distances
+
+
+# Dijkstra from s counting shortest paths - same as _brandes_bfs but order
+# is the order vertices are settled in
+def _brandes_dijkstra(offsets, targets, weights, s, n):
+    sigma = [0] * n
+    distances = [math.inf] * n
+    settled = bytearray(n)
+    sigma[s], distances[s] = 1, 0
+    order = []
+    # vertex ids and float distances - no node object per queued entry
+    pq = CompactMinPQ("q")
+    pq.enqueue(s, 0)
+
+    while len(pq):
+        v = pq.dequeue().value
+        if settled[v]:
+            continue
+        settled[v] = 1
+        order.append(v)
+        dv, sv = distances[v], sigma[v]
+        for j in range(offsets[v], offsets[v + 1]):
+            w = targets[j]
+            candidate = dv + weights[j]
+            if candidate < distances[w]:
+                distances[w] = candidate
+                sigma[w] = sv
+                pq.enqueue(w, candidate)
+            elif candidate == distances[w] and not settled[w]:
+                sigma[w] += sv
+
+    return order, sigma, distances
+
+
+def pagerank(offsets, targets, damping=0.85, tol=1e-6, max_iter=100):
+    """
+    PageRank by power iteration. Each round every vertex's rank is the
+    jump chance plus damping times the rank shared out by the vertices
+    pointing at it (pulled in over the reversed graph, one sum per vertex).
+    Vertices with no edges out share their rank with everyone.
+    :param offsets: Start of each vertex's edges in targets (length v + 1)
+    :param targets: Target vertex id of each edge
+    :param damping: Chance of following an edge rather than jumping
+    :param tol: Stop once the total change in rank is below v * tol
+    :param max_iter: Most rounds to run
+    :return: Array of ranks (summing to 1) indexed by vertex id
+    """
+    n = len(offsets) - 1
+    if n == 0:
+        return array("d")
+    in_offsets, in_targets, _ = transpose(offsets, targets)
+    degrees = list(map(sub, offsets[1:], offsets[:-1]))
+    inverse = [1 / d if d else 0.0 for d in degrees]
+    dangling = [v for v in range(n) if not degrees[v]]
+    bounds = list(zip(in_offsets[:-1], in_offsets[1:]))
+
+    ranks = [1 / n] * n
+    for _ in range(max_iter):
+        shares = list(map(mul, ranks, inverse))
+        share = shares.__getitem__
+        jump = (1 - damping + damping * sum(
+            [ranks[v] for v in dangling])) / n
+        updated = [jump + damping * sum(map(share, in_targets[lo:hi]))
+                   for lo, hi in bounds]
+        change = sum(map(abs, map(sub, updated, ranks)))
+        ranks = updated
+        if change < n * tol:
+            break
+
+    return array("d", ranks)
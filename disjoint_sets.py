@@ -0,0 +1,107 @@
+# Disjoint Set (Union-Find) - keeps track of items split into separate
+# (non overlapping) sets. Each set is a tree stored as an array of parent
+# ids, with the root as the set's representative. Two sets are joined by
+# pointing one root at the other. Uses: Kruskal's algorithm, connected
+# components, cycle detection in undirected graphs.
+# Optimisations: union by rank - shorter tree goes under the taller one so
+# trees stay shallow. Path compression - every item passed through on a
+# find is pointed straight at the root.
+# Big O: with both optimisations find and union are O(α(n)) amortised
+# (inverse Ackermann - effectively O(1)). Space: O(n)
+from array import array
+
+
+class DisjointSet:
+    """
+    Disjoint Set (Union-Find). Items are given integer ids and the parent
+    and rank of each id are stored in flat arrays.
+    :return: List of the sets contained
+    """
+    def __init__(self, items=()):
+        self.ids = {}
+        self.items = []
+        self.parent = array("q")
+        self.rank = bytearray()
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def __repr__(self):
+        return f"{self.sets()}"
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.ids
+
+    # add an item as a set of its own
+    def add(self, item):
+        if item not in self.ids:
+            self.ids[item] = len(self.items)
+            self.parent.append(len(self.items))
+            self.rank.append(0)
+            self.items.append(item)
+            self.count += 1
+
+    # find root id - iteratively to avoid the recursion limit. First pass
+    # finds the root, second points every id on the way at it
+    def _find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+
+        return root
+
+    # return the representative item of the set an item belongs to
+    def find(self, item):
+        if item not in self.ids:
+            return None
+
+        return self.items[self._find(self.ids[item])]
+
+    # join the sets of two items - returns False if already in the same set
+    def union(self, item1, item2):
+        self.add(item1)
+        self.add(item2)
+        root1 = self._find(self.ids[item1])
+        root2 = self._find(self.ids[item2])
+        if root1 == root2:
+            return False
+
+        if self.rank[root1] < self.rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if self.rank[root1] == self.rank[root2]:
+            self.rank[root1] += 1
+        self.count -= 1
+
+        return True
+
+    # check if two items are in the same set
+    def connected(self, item1, item2):
+        if item1 not in self.ids or item2 not in self.ids:
+            return False
+
+        return self._find(self.ids[item1]) == self._find(self.ids[item2])
+
+    # return an array of set ids, one per item in the order items were
+    # added. Sets are numbered 0, 1, 2... in order of their first item
+    def set_ids(self):
+        roots = {}
+        ids = array("q", [0]) * len(self.items)
+        for i in range(len(self.items)):
+            ids[i] = roots.setdefault(self._find(i), len(roots))
+
+        return ids
+
+    # return a list of every set as a list of items
+    def sets(self):
+        groups = {}
+        for i, item in enumerate(self.items):
+            groups.setdefault(self._find(i), []).append(item)
+
+        return list(groups.values())
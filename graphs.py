@@ -1,7 +1,21 @@
 from stacks import Stack
 from queues import Queue
-from priority_queue import MinPQ
+from heaps import make_heap
+from disjoint_sets import DisjointSet
+from centrality import degree_centrality, closeness_centrality, \
+    betweenness_centrality, pagerank
+from concurrent.futures import ProcessPoolExecutor
+from path_algorithms import dijkstra_search, bidirectional_dijkstra_search, \
+    build_path, k_shortest_paths, ContractionHierarchy, DistanceMatrix, \
+    DynamicShortestPaths, \
+    floyd_warshall, johnson, csr_distances, HEURISTICS
+from array import array
+import json
 import math
+import mmap
+import os
+import struct
+import tempfile
 # Graphs
 # Adjacency List - best for adding lots of nodes (vertices).
 # Adjacency matrix - best for lots of connections (edges) and querying data.
@@ -17,6 +31,226 @@ import math
 # use BFS and DFS based on weight rather than order added), N = Not weighted
 
 
+# Edge list files - one edge per line "vertex1,vertex2[,weight]" (CSV) or
+# separated by tabs/ spaces (TSV). Lines starting with # are skipped.
+# Files are read a chunk of lines at a time and edges yielded one by one so
+# the whole file is never held in memory.
+def read_edge_list(path, delimiter=None, weighted=False, vertex_type=str,
+                   chunk_size=1 << 20):
+    """
+    Stream edges from a CSV/ TSV edge list file.
+    :param path: The file to read
+    :param delimiter: Column separator (None = "," if in first line else
+    any whitespace)
+    :param weighted: Read a third column as a float weight
+    :param vertex_type: Function converting vertex text e.g. int
+    :param chunk_size: Roughly how many bytes to read at once
+    :return: Generator of (vertex1, vertex2) or (vertex1, vertex2, weight)
+    """
+    detect = delimiter is None
+    with open(path) as f:
+        while True:
+            lines = f.readlines(chunk_size)
+            if not lines:
+                return
+            for line in lines:
+                line = line.strip()
+                if not line or line[0] == "#":
+                    continue
+                if detect:
+                    delimiter = "," if "," in line else None
+                    detect = False
+                parts = line.split(delimiter)
+                if weighted:
+                    yield vertex_type(parts[0].strip()), vertex_type(
+                        parts[1].strip()), float(parts[2])
+                else:
+                    yield vertex_type(parts[0].strip()), vertex_type(
+                        parts[1].strip())
+
+
+# Binary edge lists - fixed size little endian records of two 8 byte
+# integer vertex ids (+ an 8 byte float weight). No text parsing, and the
+# file is memory mapped so the OS pages it in as it is read.
+_EDGE_RECORD = struct.Struct("<qq")
+_WEIGHTED_EDGE_RECORD = struct.Struct("<qqd")
+
+
+def write_binary_edges(path, edges, weighted=False):
+    """
+    Write integer vertex edges to a binary edge list file.
+    :param path: The file to write
+    :param edges: Iterable of (vertex1, vertex2) or (vertex1, vertex2, weight)
+    :param weighted: Write the weight of each edge
+    :return: Number of edges written
+    """
+    record = _WEIGHTED_EDGE_RECORD if weighted else _EDGE_RECORD
+    count = 0
+    with open(path, "wb") as f:
+        for edge in edges:
+            f.write(record.pack(*edge[:record.size // 8]))
+            count += 1
+
+    return count
+
+
+def read_binary_edges(path, weighted=False):
+    """
+    Stream edges from a binary edge list file (memory mapped).
+    :param path: The file to read
+    :param weighted: Records include a weight
+    :return: Generator of (vertex1, vertex2) or (vertex1, vertex2, weight)
+    """
+    record = _WEIGHTED_EDGE_RECORD if weighted else _EDGE_RECORD
+    with open(path, "rb") as f:
+        # empty files cannot be memory mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from record.iter_unpack(mapped)
+
+
+# edges from a text or binary edge list file for load_edge_list
+def _edge_file(path, weighted, delimiter, vertex_type, binary):
+    if binary:
+        return read_binary_edges(path, weighted)
+    return read_edge_list(path, delimiter, weighted, vertex_type)
+
+
+# Generator traversals shared by the adjacency list graphs. Each takes a
+# function returning the neighbours of a vertex and yields results one at a
+# time using an explicit queue/ stack rather than recursion, so there is no
+# recursion limit, memory stays at O(v) and callers can stop at any point.
+# max_depth is the most edges allowed from the start vertex and limit is the
+# most results yielded (None = no limit).
+# BFS generator - yields vertices in breadth first order
+def _iter_bfs(neighbors, vertex, max_depth=None, limit=None):
+    if limit is not None and limit <= 0:
+        return
+    seen = {vertex}
+    vertices_in_queue = Queue()
+    vertices_in_queue.enqueue((vertex, 0))
+    count = 0
+
+    while len(vertices_in_queue) > 0:
+        current, depth = vertices_in_queue.dequeue()
+        yield current
+        count += 1
+        if count == limit:
+            return
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        for v in neighbors(current):
+            if v not in seen:
+                seen.add(v)
+                vertices_in_queue.enqueue((v, depth + 1))
+
+
+# DFS generator - yields vertices in the same order as dfs_rec. Stack holds
+# an iterator over each open vertex's neighbours so traversal resumes where
+# it left off after backtracking. With max_depth a vertex is only yielded
+# for the first path found to it, which may not be its shortest path
+def _iter_dfs(neighbors, vertex, max_depth=None, limit=None):
+    if limit is not None and limit <= 0:
+        return
+    seen = {vertex}
+    yield vertex
+    count = 1
+    if count == limit or max_depth is not None and max_depth <= 0:
+        return
+    stack = [(iter(neighbors(vertex)), 0)]
+
+    while stack:
+        neighbors_left, depth = stack[-1]
+        for v in neighbors_left:
+            if v not in seen:
+                seen.add(v)
+                yield v
+                count += 1
+                if count == limit:
+                    return
+                if max_depth is None or depth + 1 < max_depth:
+                    stack.append((iter(neighbors(v)), depth + 1))
+                break
+        else:
+            # all neighbours explored - backtrack
+            stack.pop()
+
+
+# Paths generator - yields every simple path (no repeated vertices so
+# cycles are never followed) from start to end as a list of vertices
+def _iter_paths(neighbors, start, end, max_depth=None, limit=None):
+    if limit is not None and limit <= 0:
+        return
+    if start == end:
+        yield [start]
+        return
+    path = [start]
+    on_path = {start}
+    stack = [iter(neighbors(start))]
+    count = 0
+
+    while stack:
+        for v in stack[-1]:
+            if v in on_path:
+                continue
+            if v == end:
+                # path + [end] has len(path) edges
+                if max_depth is None or len(path) <= max_depth:
+                    yield path + [end]
+                    count += 1
+                    if count == limit:
+                        return
+            elif max_depth is None or len(path) < max_depth:
+                path.append(v)
+                on_path.add(v)
+                stack.append(iter(neighbors(v)))
+                break
+        else:
+            stack.pop()
+            on_path.discard(path.pop())
+
+
+# Bidirectional BFS - grows a search from each end one full level at a time
+# (always the smaller frontier) until a vertex is reached from both sides.
+# forward gives a vertex's neighbours, backward the vertices with an edge
+# to it (same as forward for undirected graphs)
+def _bidirectional_bfs(forward, backward, start, end):
+    if start == end:
+        return [start]
+    # vertex => vertex it was reached from, for each side
+    parents = {start: None}
+    children = {end: None}
+    front, back = [start], [end]
+
+    while front and back:
+        if len(front) <= len(back):
+            frontier, neighbors, reached, other = front, forward, parents, \
+                children
+        else:
+            frontier, neighbors, reached, other = back, backward, children, \
+                parents
+        next_frontier = []
+        for v in frontier:
+            for w in neighbors(v):
+                if w not in reached:
+                    reached[w] = v
+                    if w in other:
+                        path = build_path(parents, w)
+                        while children[w] is not None:
+                            w = children[w]
+                            path.append(w)
+                        return path
+                    next_frontier.append(w)
+        if frontier is front:
+            front = next_frontier
+        else:
+            back = next_frontier
+
+    return []
+
+
 # Adjacency List Undirected Non Weighted Graph
 class ALUNGraph:
     """
@@ -64,6 +298,53 @@ class ALUNGraph:
             self.adjacency_list.pop(vertex, None)
             # print(f"Removed {vertex}.")
 
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return self.adjacency_list[vertex]
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(map(len, map(self._neighbors, vertices)))
+
+    # build a graph from an iterable of (vertex1, vertex2) edges. Edges are
+    # appended without checking for duplicates, then each vertex's list is
+    # deduplicated once at the end - O(v + e) rather than a scan per edge
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        adjacency_list = graph.adjacency_list
+        for edge in edges:
+            vertex1, vertex2 = edge[0], edge[1]
+            adjacency_list.setdefault(vertex1, []).append(vertex2)
+            adjacency_list.setdefault(vertex2, []).append(vertex1)
+        for vertex, neighbors in adjacency_list.items():
+            adjacency_list[vertex] = list(dict.fromkeys(neighbors))
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, False, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below) - much
+    # smaller and faster to traverse but cannot be changed
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(self.adjacency_list)
+
+    # shortest distance from each source to every vertex, spread across
+    # worker processes (see CSRGraph.multi_source_distances)
+    def multi_source_distances(self, sources, workers=None, path=None):
+        return self.freeze().multi_source_distances(sources, workers, path)
+
+    # save a read only binary snapshot of the graph - reopen it with
+    # CSRGraph.open(path) (see CSRGraph.save)
+    def save_snapshot(self, path):
+        self.freeze().save(path)
+
     # depth first traversal of nodes - move from node to node until all
     # nodes explored - only backtrack if no further option
     # DFS - Recursively
@@ -83,40 +364,95 @@ class ALUNGraph:
         traverse(vertex)
         return vertex_list
 
-    # DFS - Iteratively - Reverse order of recursive approach
-    def dfs_iter(self, vertex):
+    # Connected components - split the graph into groups of vertices which
+    # can reach each other, using a disjoint set (union of every edge) so
+    # there is no traversal or recursion. Time: ~O(v + e).
+    # Returns (number of components, array of component id per vertex in
+    # adjacency_list order) - compact enough to send to worker processes
+    def connected_components(self):
+        components = DisjointSet(self.adjacency_list)
+        for vertex in self.adjacency_list:
+            for v in self._neighbors(vertex):
+                components.union(vertex, v)
+
+        return components.count, components.set_ids()
+
+    # DFS - Iteratively - Reverse order of recursive approach. Visited and
+    # stacked vertices kept in a set so each check is O(1) => O(v + e)
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
+        seen = {vertex}
         vertices_in_stack = Stack()
         vertices_in_stack.push(vertex)
 
         while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
             current = vertices_in_stack.pop()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v not in vertex_visited and v not in vertices_in_stack:
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
                     vertices_in_stack.push(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
     # breadth first traversal of nodes - explore all paths on one node then
     # move to next
     # Breadth First - same logic as DFS (iter) but queues instead of stacks
-    def bfs(self, vertex):
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
-        vertices_in_stack = Queue()
-        vertices_in_stack.enqueue(vertex)
-
-        while len(vertices_in_stack) > 0:
-            current = vertices_in_stack.dequeue()
+        seen = {vertex}
+        vertices_in_queue = Queue()
+        vertices_in_queue.enqueue(vertex)
+
+        while len(vertices_in_queue) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_queue))
+            current = vertices_in_queue.dequeue()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v not in vertex_visited and v not in vertices_in_stack:
-                    vertices_in_stack.enqueue(v)
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_queue.enqueue(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
+    # Generators - yield vertices/ paths lazily (see _iter_bfs etc above).
+    # max_depth = most edges from vertex, limit = most results returned
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
+
+    # yields simple paths (no cycles) from vertex to destination
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # Bidirectional BFS - shortest (fewest edges) path from vertex to
+    # destination. Searches out from both ends a level at a time (smaller
+    # side first) and stops when they meet - explores roughly the square
+    # root of what a one way BFS would. Returns [] if no path
+    def bidirectional_bfs(self, vertex, destination):
+        return _bidirectional_bfs(self._neighbors, self._neighbors, vertex,
+                                  destination)
+
 
 # Adjacency List Directed Non Weighted Graph
 class ALDNGraph:
@@ -127,6 +463,9 @@ class ALDNGraph:
     """
     def __init__(self):
         self.adjacency_list = {}
+        # cached vertex => list of vertices with an edge to it, rebuilt on
+        # first use after the edges change (see _predecessors)
+        self._reverse = None
 
     def __repr__(self):
         return f"{self.adjacency_list}"
@@ -142,6 +481,7 @@ class ALDNGraph:
         if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list:
             if vertex2 not in self.adjacency_list[vertex1]:
                 self.adjacency_list[vertex1].append(vertex2)
+                self._reverse = None
                 # print(f"Added edge between {vertex1} and {vertex2}.")
             # if vertex1 not in self.adjacency_list[vertex2]:
             #     self.adjacency_list[vertex2].append(vertex1)
@@ -152,19 +492,95 @@ class ALDNGraph:
         if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list:
             try:
                 self.adjacency_list[vertex1].remove(vertex2)
+                self._reverse = None
                 # self.adjacency_list[vertex2].remove(vertex1)
                 # print(f"Removed edge between {vertex1} and {vertex2}.")
             except ValueError:
                 print(f"No edge found between {vertex1} and {vertex2}.")
 
-    # remove a vertex (including all its edges)
+    # remove a vertex (including all its edges) - edges into the vertex are
+    # found with the reverse adjacency list
     def remove_vertex(self, vertex):
         if vertex in self.adjacency_list:
-            for v in self.adjacency_list[vertex]:
-                self.remove_edge(vertex, v)
+            for v in self._predecessors(vertex):
+                if v != vertex:
+                    self.adjacency_list[v].remove(vertex)
             self.adjacency_list.pop(vertex, None)
+            self._reverse = None
             # print(f"Removed {vertex}.")
 
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return self.adjacency_list[vertex]
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(map(len, map(self._neighbors, vertices)))
+
+    # return vertices with an edge to vertex - builds the reverse adjacency
+    # list once (O(v + e)) and reuses it until the edges change
+    def _predecessors(self, vertex):
+        if self._reverse is None:
+            self._reverse = {}
+            for v, edges in self.adjacency_list.items():
+                for w in edges:
+                    self._reverse.setdefault(w, []).append(v)
+
+        return self._reverse.get(vertex, [])
+
+    # build a graph from an iterable of (vertex1, vertex2) edges. Edges are
+    # appended without checking for duplicates, then each vertex's list is
+    # deduplicated once at the end - O(v + e) rather than a scan per edge
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        adjacency_list = graph.adjacency_list
+        for edge in edges:
+            vertex1, vertex2 = edge[0], edge[1]
+            adjacency_list.setdefault(vertex1, []).append(vertex2)
+            adjacency_list.setdefault(vertex2, [])
+        for vertex, neighbors in adjacency_list.items():
+            adjacency_list[vertex] = list(dict.fromkeys(neighbors))
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, False, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below) - much
+    # smaller and faster to traverse but cannot be changed
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(self.adjacency_list, directed=True)
+
+    # Centrality - importance score of every vertex computed over a frozen
+    # CSR copy (see CSRGraph and centrality.py). Dict of vertex => score
+    def degree_centrality(self, direction="out"):
+        return self.freeze().degree_centrality(direction)
+
+    def closeness_centrality(self):
+        return self.freeze().closeness_centrality()
+
+    def betweenness_centrality(self, normalized=True, sources=None):
+        return self.freeze().betweenness_centrality(normalized, sources)
+
+    def pagerank(self, damping=0.85, tol=1e-6, max_iter=100):
+        return self.freeze().pagerank(damping, tol, max_iter)
+
+    # shortest distance from each source to every vertex, spread across
+    # worker processes (see CSRGraph.multi_source_distances)
+    def multi_source_distances(self, sources, workers=None, path=None):
+        return self.freeze().multi_source_distances(sources, workers, path)
+
+    # save a read only binary snapshot of the graph - reopen it with
+    # CSRGraph.open(path) (see CSRGraph.save)
+    def save_snapshot(self, path):
+        self.freeze().save(path)
+
     # depth first traversal of nodes - move from node to node until all
     # nodes explored - only backtrack if no further option
     # DFS - Recursively
@@ -184,73 +600,265 @@ class ALDNGraph:
         traverse(vertex)
         return vertex_list
 
-    # DFS - Iteratively - Reverse order of recursive approach
-    def dfs_iter(self, vertex):
+    # DFS - Iteratively - Reverse order of recursive approach. Visited and
+    # stacked vertices kept in a set so each check is O(1) => O(v + e)
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
+        seen = {vertex}
         vertices_in_stack = Stack()
         vertices_in_stack.push(vertex)
 
         while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
             current = vertices_in_stack.pop()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v not in vertex_visited and v not in vertices_in_stack:
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
                     vertices_in_stack.push(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
     # breadth first traversal of nodes - explore all paths on one node then
     # move to next
     # Breadth First - same logic as DFS (iter) but queues instead of stacks
-    def bfs(self, vertex):
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
-        vertices_in_stack = Queue()
-        vertices_in_stack.enqueue(vertex)
-
-        while len(vertices_in_stack) > 0:
-            current = vertices_in_stack.dequeue()
+        seen = {vertex}
+        vertices_in_queue = Queue()
+        vertices_in_queue.enqueue(vertex)
+
+        while len(vertices_in_queue) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_queue))
+            current = vertices_in_queue.dequeue()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v not in vertex_visited and v not in vertices_in_stack:
-                    vertices_in_stack.enqueue(v)
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_queue.enqueue(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
-    # DFS - Find all Paths
-    def path_finder_dfs_rec(self, vertex, destination):
-        paths = []
-        current_path = []
-
-        # helper function called recursively
-        def traverse(ver, dest):
-            current_path.append(ver)
-
-            if ver == dest:
-                # make copy or python will overwrite
-                temp = current_path.copy()
-                paths.append(temp)
-            else:
-                for v in self.adjacency_list[ver]:
-                    traverse(v, dest)
-
-            # pop last from list so current_path accurate
-            current_path.pop()
-
-        traverse(vertex, destination)
-        return paths
+    # Generators - yield vertices/ paths lazily (see _iter_bfs etc above).
+    # max_depth = most edges from vertex, limit = most results returned
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
+
+    # yields simple paths (no cycles) from vertex to destination
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # Bidirectional BFS - shortest (fewest edges) path from vertex to
+    # destination. Searches forward from vertex and backwards (along
+    # reversed edges) from destination a level at a time (smaller side
+    # first) and stops when they meet. Returns [] if no path
+    def bidirectional_bfs(self, vertex, destination):
+        return _bidirectional_bfs(self._neighbors, self._predecessors, vertex,
+                                  destination)
+
+    # Strongly connected components (Tarjan's algorithm) - groups where
+    # every vertex can reach every other following edge directions. DFS
+    # numbers vertices in visit order and tracks the lowest number reachable
+    # (low link) from each; a vertex whose low link is its own number is the
+    # root of a component, made of it and everything above it on the stack.
+    # Iterative with an explicit stack so no recursion limit. Components are
+    # numbered in reverse topological order. Time: O(v + e)
+    # Returns (number of components, array of component id per vertex in
+    # adjacency_list order)
+    def strongly_connected_components(self):
+        vertices = list(self.adjacency_list)
+        ids = {v: i for i, v in enumerate(vertices)}
+        n = len(vertices)
+        index = array("q", [-1]) * n
+        low = array("q", [0]) * n
+        component = array("q", [-1]) * n
+        on_stack = bytearray(n)
+        stack = []
+        counter = count = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(self.adjacency_list[vertices[root]]))]
+
+            while work:
+                i, neighbors_left = work[-1]
+                for v in neighbors_left:
+                    j = ids[v]
+                    if index[j] == -1:
+                        index[j] = low[j] = counter
+                        counter += 1
+                        stack.append(j)
+                        on_stack[j] = 1
+                        work.append((j, iter(self.adjacency_list[v])))
+                        break
+                    elif on_stack[j] and index[j] < low[i]:
+                        low[i] = index[j]
+                else:
+                    work.pop()
+                    if work and low[i] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[i]
+                    if low[i] == index[i]:
+                        while True:
+                            j = stack.pop()
+                            on_stack[j] = 0
+                            component[j] = count
+                            if j == i:
+                                break
+                        count += 1
+
+        return count, component
+
+    # Weakly connected components - groups connected when edge directions
+    # are ignored (see connected_components on ALUNGraph). Same return
+    def weakly_connected_components(self):
+        components = DisjointSet(self.adjacency_list)
+        for vertex, edges in self.adjacency_list.items():
+            for v in edges:
+                components.union(vertex, v)
+
+        return components.count, components.set_ids()
+
+    # Topological sort (Kahn's algorithm) - order vertices so every edge
+    # goes from an earlier vertex to a later one e.g. jobs before the jobs
+    # that depend on them. Only possible for a DAG (directed acyclic graph).
+    # Count edges into each vertex (in-degree, kept in an array by vertex
+    # id), start with those at 0 and each time a vertex is output take 1
+    # off its neighbours' counts, outputting any that reach 0. Iterative so
+    # no recursion limit. Time: O(v + e), Space: O(v)
+    # Returns list of vertices - None if the graph has a cycle
+    def topological_sort(self):
+        levels = self.topological_levels()
+        if levels is None:
+            return None
+
+        return [v for level in levels for v in level]
+
+    # Kahn's algorithm a level at a time - each level is every vertex whose
+    # edges in all come from earlier levels, so the vertices of a level do
+    # not depend on each other and can run at the same time.
+    # Returns list of lists of vertices - None if the graph has a cycle
+    def topological_levels(self):
+        vertices = list(self.adjacency_list)
+        ids = {v: i for i, v in enumerate(vertices)}
+        in_degree = array("q", [0]) * len(vertices)
+        for edges in self.adjacency_list.values():
+            for v in edges:
+                in_degree[ids[v]] += 1
+
+        levels = []
+        level = [i for i in range(len(vertices)) if in_degree[i] == 0]
+        done = 0
+        while level:
+            levels.append([vertices[i] for i in level])
+            done += len(level)
+            next_level = []
+            for i in level:
+                for v in self.adjacency_list[vertices[i]]:
+                    j = ids[v]
+                    in_degree[j] -= 1
+                    if in_degree[j] == 0:
+                        next_level.append(j)
+            level = next_level
+
+        # vertices on or after a cycle never reach in-degree 0
+        return levels if done == len(vertices) else None
+
+    # Cycle detection - iterative DFS colouring each vertex unvisited,
+    # in progress (on the current path) or done. An edge to an in progress
+    # vertex closes a cycle. Stack holds an iterator over each in progress
+    # vertex's neighbours. Time: O(v + e)
+    # Returns a cycle as a list of vertices (first repeated at the end) or
+    # [] if the graph is acyclic
+    def find_cycle(self):
+        in_progress, done = 1, 2
+        state = dict.fromkeys(self.adjacency_list, 0)
+
+        for root in self.adjacency_list:
+            if state[root]:
+                continue
+            state[root] = in_progress
+            path = [root]
+            stack = [iter(self.adjacency_list[root])]
+
+            while stack:
+                for v in stack[-1]:
+                    if state[v] == in_progress:
+                        return path[path.index(v):] + [v]
+                    if not state[v]:
+                        state[v] = in_progress
+                        path.append(v)
+                        stack.append(iter(self.adjacency_list[v]))
+                        break
+                else:
+                    state[path.pop()] = done
+                    stack.pop()
+
+        return []
+
+    # check if the graph has a cycle (i.e. is not a DAG)
+    def has_cycle(self):
+        return len(self.find_cycle()) > 0
+
+    # DFS - Find all Paths - only simple paths (no repeated vertices) so
+    # cycles are never followed. The number of paths can grow exponentially
+    # so max_paths caps how many are returned and max_length the edges in a
+    # path. Iterative (see iter_paths for a lazy generator version)
+    def path_finder_dfs_rec(self, vertex, destination, max_paths=None,
+                            max_length=None):
+        return list(self.iter_paths(vertex, destination, max_length,
+                                    max_paths))
+
+    # k shortest paths (Yen's algorithm, see path_algorithms) - the k paths
+    # with fewest edges, shortest first, as a list of (edges, path)
+    def k_shortest_paths(self, vertex, destination, k):
+        if vertex not in self.adjacency_list or \
+                destination not in self.adjacency_list:
+            return []
+
+        return k_shortest_paths(lambda v: ((w, 1) for w in
+                                           self.adjacency_list[v]),
+                                vertex, destination, k)
 
 
 # Adjacency List Undirected Weighted Graph
 class ALUWGraph:
     """
-    Adjacency List Undirected Weighted. Create a list which stores the
-    vertices (value and weight) and edges of a graph.
-    :return: List of values contained in the ALUW
+    Adjacency List Undirected Weighted. Create a hash table which stores
+    each vertex's neighbours as a dict of neighbour => edge weight.
+    :return: Dict of values contained in the ALUW
     """
     def __init__(self):
         self.adjacency_list = {}
+        # optional vertex => position e.g. (x, y) or (lat, lon) used by astar
+        self.coordinates = {}
+        # DynamicShortestPaths kept up to date as edges change (see
+        # dynamic_shortest_paths)
+        self.trackers = []
 
     def __repr__(self):
         return f"{self.adjacency_list}"
@@ -263,55 +871,128 @@ class ALUWGraph:
                 self.add_edge(k, i, j)
 
 
-    # add a vertex (node) to hash table
-    def add_vertex(self, vertex):
+    # add a vertex (node) to hash table - optionally with its coordinates
+    def add_vertex(self, vertex, coordinates=None):
         if vertex not in self.adjacency_list:
-            self.adjacency_list[vertex] = []
+            self.adjacency_list[vertex] = {}
             # print(f"{vertex} added as a vertex.")
+        if coordinates is not None:
+            self.coordinates[vertex] = coordinates
 
-    # add an edge (connection) to a vertex
+    # set the position of a vertex e.g. (x, y) or (lat, lon) for astar
+    def set_coordinates(self, vertex, coordinates):
+        if vertex in self.adjacency_list:
+            self.coordinates[vertex] = coordinates
+
+    # Neighbours are keyed by vertex so adding, removing and checking an
+    # edge are all O(1) hash table operations rather than a scan of the
+    # vertex's neighbours. Removing a vertex is O(degree).
+    # add an edge (connection) to a vertex - an existing edge keeps its weight
     def add_edge(self, vertex1, vertex2, weight):
         if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list:
-            for i in self.adjacency_list[vertex1]:
-                if i["vertex"] == vertex2:
-                    break
-            else:
-                self.adjacency_list[vertex1].append({"vertex": vertex2,
-                                                    "weight": weight})
+            if vertex2 not in self.adjacency_list[vertex1]:
+                self.adjacency_list[vertex1][vertex2] = weight
                 # print(f"Added edge between {vertex1} and {vertex2}.")
-            for j in self.adjacency_list[vertex2]:
-                if j["vertex"] == vertex1:
-                    break
-            else:
-                self.adjacency_list[vertex2].append({"vertex": vertex1,
-                                                    "weight": weight})
+            if vertex1 not in self.adjacency_list[vertex2]:
+                self.adjacency_list[vertex2][vertex1] = weight
                 # print(f"Added edge between {vertex2} and {vertex1}.")
+                self._changed(vertex1, vertex2, math.inf, weight)
+
+    # change the weight of an existing edge - O(1)
+    def set_weight(self, vertex1, vertex2, weight):
+        old = self.get_weight(vertex1, vertex2)
+        if old is None:
+            print(f"No edge found between {vertex1} and {vertex2}.")
+            return
+        self.adjacency_list[vertex1][vertex2] = weight
+        self.adjacency_list[vertex2][vertex1] = weight
+        self._changed(vertex1, vertex2, old, weight)
 
     # remove an edge between vertex
     def remove_edge(self, vertex1, vertex2):
         if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list:
-            try:
-                for i in self.adjacency_list[vertex1]:
-                    if i["vertex"] == vertex2:
-                        self.adjacency_list[vertex1].remove(i)
-                        # break
-                for j in self.adjacency_list[vertex2]:
-                    if j["vertex"] == vertex1:
-                        self.adjacency_list[vertex2].remove(j)
-                        # return
-                print(f"Removed edge between {vertex1} and {vertex2}.")
-            except ValueError:
+            if vertex2 not in self.adjacency_list[vertex1]:
                 print(f"No edge found between {vertex1} and {vertex2}.")
+                return
+            weight = self.adjacency_list[vertex1].pop(vertex2)
+            self.adjacency_list[vertex2].pop(vertex1, None)
+            # print(f"Removed edge between {vertex1} and {vertex2}.")
+            self._changed(vertex1, vertex2, weight, math.inf)
 
     # remove a vertex (including all its edges)
     def remove_vertex(self, vertex):
         if vertex in self.adjacency_list:
-            while len(self.adjacency_list[vertex]) > 0:
-                for v in self.adjacency_list[vertex]:
-                    self.remove_edge(vertex, v["vertex"])
+            for v in self.adjacency_list[vertex]:
+                # a self loop is dropped with the vertex's own dict below
+                if v != vertex:
+                    self.adjacency_list[v].pop(vertex, None)
 
             self.adjacency_list.pop(vertex, None)
-            print(f"Removed {vertex}.")
+            self.coordinates.pop(vertex, None)
+            # print(f"Removed {vertex}.")
+            for tracker in self.trackers:
+                tracker.remove_vertex(vertex)
+
+    # pass an edge change (both directions) on to every tracker
+    def _changed(self, vertex1, vertex2, old, new):
+        for tracker in self.trackers:
+            tracker.update(vertex1, vertex2, old, new)
+            tracker.update(vertex2, vertex1, old, new)
+
+    # check for an edge - O(1)
+    def has_edge(self, vertex1, vertex2):
+        return vertex1 in self.adjacency_list and \
+            vertex2 in self.adjacency_list[vertex1]
+
+    # return weight of an edge - None if no edge - O(1)
+    def get_weight(self, vertex1, vertex2):
+        if vertex1 not in self.adjacency_list:
+            return None
+        return self.adjacency_list[vertex1].get(vertex2)
+
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return self.adjacency_list[vertex]
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(map(len, map(self._neighbors, vertices)))
+
+    # build a graph from an iterable of (vertex1, vertex2, weight) edges.
+    # Neighbours are dicts so duplicates are dropped for free (the first
+    # weight is kept like add_edge) - O(v + e)
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        adjacency_list = graph.adjacency_list
+        for vertex1, vertex2, weight in edges:
+            adjacency_list.setdefault(vertex1, {}).setdefault(vertex2, weight)
+            adjacency_list.setdefault(vertex2, {}).setdefault(vertex1, weight)
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, True, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below) - much
+    # smaller and faster to traverse but cannot be changed
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(self.adjacency_list)
+
+    # shortest distance from each source to every vertex, spread across
+    # worker processes (see CSRGraph.multi_source_distances)
+    def multi_source_distances(self, sources, workers=None, path=None):
+        return self.freeze().multi_source_distances(sources, workers, path)
+
+    # save a read only binary snapshot of the graph - reopen it with
+    # CSRGraph.open(path) (see CSRGraph.save)
+    def save_snapshot(self, path):
+        self.freeze().save(path)
 
     # depth first traversal of nodes - move from node to node until all
     # nodes explored - only backtrack if no further option
@@ -327,104 +1008,1409 @@ class ALUWGraph:
             vertex_visited[ver] = True
             vertex_list.append(ver)
             for v in self.adjacency_list[ver]:
-                traverse(v["vertex"])
+                traverse(v)
 
         traverse(vertex)
         return vertex_list
 
-    # DFS - Iteratively - Reverse order of recursive approach
-    def dfs_iter(self, vertex):
+    # Connected components - split the graph into groups of vertices which
+    # can reach each other, using a disjoint set (union of every edge) so
+    # there is no traversal or recursion. Time: ~O(v + e).
+    # Returns (number of components, array of component id per vertex in
+    # adjacency_list order) - compact enough to send to worker processes
+    def connected_components(self):
+        components = DisjointSet(self.adjacency_list)
+        for vertex in self.adjacency_list:
+            for v in self._neighbors(vertex):
+                components.union(vertex, v)
+
+        return components.count, components.set_ids()
+
+    # DFS - Iteratively - Reverse order of recursive approach. Visited and
+    # stacked vertices kept in a set so each check is O(1) => O(v + e)
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
+        seen = {vertex}
         vertices_in_stack = Stack()
         vertices_in_stack.push(vertex)
 
         while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
             current = vertices_in_stack.pop()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v["vertex"] not in vertex_visited and v["vertex"] not in \
-                        vertices_in_stack:
-                    vertices_in_stack.push(v["vertex"])
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_stack.push(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
     # breadth first traversal of nodes - explore all paths on one node then
     # move to next
     # Breadth First - same logic as DFS (iter) but queues instead of stacks
-    def bfs(self, vertex):
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
         vertex_visited = []
-        vertices_in_stack = Queue()
-        vertices_in_stack.enqueue(vertex)
-
-        while len(vertices_in_stack) > 0:
-            current = vertices_in_stack.dequeue()
+        seen = {vertex}
+        vertices_in_queue = Queue()
+        vertices_in_queue.enqueue(vertex)
+
+        while len(vertices_in_queue) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_queue))
+            current = vertices_in_queue.dequeue()
             vertex_visited.append(current)
 
-            for v in self.adjacency_list[current]:
-                if v["vertex"] not in vertex_visited and v["vertex"] not in \
-                        vertices_in_stack:
-                    vertices_in_stack.enqueue(v["vertex"])
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_queue.enqueue(v)
 
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
         return vertex_visited
 
-    # Dijkstra's algorithm - find shortest path in a weight undirected graph
-    # using a priority queue system
-    def dijkstra(self, start, end):
-        # hash table to store routes
-        distances = {k: (0 if k == start else math.inf) for k, v in
-                     self.adjacency_list.items()}
-        previous = {k: None for k, v in self.adjacency_list.items()}
-
-        # path to be returned at end with final distance as a tuple
-        path = []
+    # Generators - yield vertices/ paths lazily (see _iter_bfs etc above).
+    # max_depth = most edges from vertex, limit = most results returned
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
 
-        # min priority queue to get shortest path
-        pq = MinPQ()
-        pq.enqueue_all([(k, 0) if k == start else (k, math.inf) for k in
-                        self.adjacency_list])
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
 
-        while len(pq):
-            # dequeue start node and store it's value
-            node = pq.dequeue().value
-            # once target dequeued can stop
-            if node == end:
-                while previous[node]:
-                    path.append(node)
-                    node = previous[node]
-                path.append(start)
-                break
+    # yields simple paths (no cycles) from vertex to destination
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # return (neighbour, weight) pairs of a vertex
+    def _weighted_neighbors(self, vertex):
+        return self.adjacency_list[vertex].items()
 
-            if node or distances[node] != math.inf:
-                # loop through nodes neighbors calculating path as you go
-                for neighbor in self.adjacency_list[node]:
-                    # calculate new dist to neighboring node
-                    candidate = distances[node] + neighbor["weight"]
-                    # if candidate smaller than distance table => add
-                    if candidate < distances[neighbor["vertex"]]:
-                        # updating new smallest distance to neighbor
-                        distances[neighbor["vertex"]] = candidate
-                        # updating previous - how we got to neighbor
-                        previous[neighbor["vertex"]] = node
-                        # enqueue in priority queue with new priority
-                        pq.enqueue(neighbor["vertex"], candidate)
-
-        return f"The shortest distance from {start} to {end} is" \
-               f" {distances[end]}", path[::-1]
+    # Dijkstra's algorithm - find shortest path in a weight undirected graph
+    # using a priority queue system (see path_algorithms.dijkstra_search).
+    # bidirectional=True searches from both ends at once and stops when they
+    # meet - much less of a big graph is explored for a single pair.
+    # stats = optional search_stats.SearchStats to record the search in,
+    # heap = queue to use, a name from heaps.HEAPS e.g. "pairing".
+    # Returns (distance, path) - (inf, []) if end cannot be reached
+    def dijkstra(self, start, end, bidirectional=False, stats=None,
+                 heap="binary"):
+        if start not in self.adjacency_list or end not in self.adjacency_list:
+            return math.inf, []
+        if bidirectional:
+            return bidirectional_dijkstra_search(self._weighted_neighbors,
+                                                 self._weighted_neighbors,
+                                                 start, end, stats, heap)
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              [end], stats=stats, heap=heap)
+        return distances.get(end, math.inf), build_path(previous, end)
+
+    # Dijkstra's algorithm - shortest distance from start to every vertex it
+    # can reach. Returns dicts (distances, previous) - use
+    # path_algorithms.build_path(previous, vertex) to get the path to a vertex
+    def dijkstra_all(self, start, stats=None, heap="binary"):
+        if start not in self.adjacency_list:
+            return {}, {}
+
+        return dijkstra_search(self._weighted_neighbors, start, stats=stats,
+                               heap=heap)
+
+    # Dynamic shortest paths - distances and paths from source which stay
+    # up to date as add_edge, remove_edge, set_weight and remove_vertex run,
+    # repairing only the part of the tree a change affects (see
+    # path_algorithms.DynamicShortestPaths). Lookups are then O(1) rather
+    # than a new search per query. Stop updates with untrack(tracker)
+    def dynamic_shortest_paths(self, source):
+        if source not in self.adjacency_list:
+            return None
+        tracker = DynamicShortestPaths(self._weighted_neighbors, source)
+        self.trackers.append(tracker)
+        return tracker
+
+    # stop keeping a DynamicShortestPaths up to date
+    def untrack(self, tracker):
+        if tracker in self.trackers:
+            self.trackers.remove(tracker)
+
+    # Dijkstra's algorithm - shortest paths from start to several targets in
+    # one search, stopping once all are reached (stats and heap as
+    # dijkstra). Returns dict of target => (distance, path)
+    def dijkstra_many(self, start, targets, stats=None, heap="binary"):
+        targets = list(targets)
+        if start not in self.adjacency_list:
+            return {t: (math.inf, []) for t in targets}
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              targets, stats=stats, heap=heap)
+        return {t: (distances.get(t, math.inf), build_path(previous, t))
+                for t in targets}
+
+    # A* search - Dijkstra's algorithm guided towards the goal. Each queued
+    # vertex's priority is its distance so far + heuristic estimate of the
+    # distance left (using vertex coordinates), so vertices heading away
+    # from the goal are expanded later or never. heuristic is a name from
+    # path_algorithms.HEURISTICS ("euclidean", "manhattan", "haversine") or a
+    # function(coordinates1, coordinates2). Path is only guaranteed shortest
+    # if the estimate never exceeds the real distance (edge weights must use
+    # the same units as the heuristic) - vertices are reopened if a shorter
+    # path to them turns up, so the estimate need not be consistent.
+    # Vertices without coordinates are estimated at 0. stats and heap as
+    # dijkstra. Returns (distance, path) like dijkstra
+    def astar(self, start, goal, heuristic="euclidean", stats=None,
+              heap="binary"):
+        if start not in self.adjacency_list or goal not in self.adjacency_list:
+            return math.inf, []
+
+        if not callable(heuristic):
+            heuristic = HEURISTICS[heuristic]
+        coordinates = self.coordinates
+        goal_coordinates = coordinates.get(goal)
+
+        def estimate(vertex):
+            if goal_coordinates is None or vertex not in coordinates:
+                return 0
+            return heuristic(coordinates[vertex], goal_coordinates)
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              [goal], estimate, stats, heap)
+        return distances.get(goal, math.inf), build_path(previous, goal)
+
+    # k shortest paths (Yen's algorithm, see path_algorithms) - e.g. route
+    # alternatives. Returns list of (distance, path), shortest first
+    def k_shortest_paths(self, start, end, k):
+        if start not in self.adjacency_list or end not in self.adjacency_list:
+            return []
+
+        return k_shortest_paths(self._weighted_neighbors, start, end, k)
+
+    # build a contraction hierarchy index for answering many shortest path
+    # queries fast (see path_algorithms.ContractionHierarchy). Rebuild it
+    # after changing the graph. Can be saved with save(path)
+    def contraction_hierarchy(self, settle_limit=500):
+        return ContractionHierarchy.build(self._weighted_neighbors,
+                                          self.adjacency_list, settle_limit)
+
+    # All pairs shortest paths - distance between every pair of vertices as
+    # a path_algorithms.DistanceMatrix (matrix[vertex1, vertex2]).
+    # method "floyd_warshall" suits small/ dense graphs (O(v^3)), "johnson"
+    # big sparse ones (runs a Dijkstra per vertex across worker processes).
+    # path memory maps the result to a file for graphs too big for memory
+    def all_pairs_shortest_paths(self, method="johnson", workers=None,
+                                 path=None):
+        if method == "floyd_warshall":
+            return floyd_warshall(self._weighted_neighbors,
+                                  self.adjacency_list, path)
+        if method == "johnson":
+            return johnson(self._weighted_neighbors, self.adjacency_list,
+                           workers, path)
+        raise ValueError(f"Unknown all pairs method {method}.")
 
     # Prim's algroithm for finding minimum spanning tree (MST) of a graph
-    # Time complexity: O(log(n)). Form a tree that includes every vertex
+    # Time complexity: O(e log(v)). Form a tree that includes every vertex
     # with the minimum weight. Greedy algorith i.e. finds local optimum in
-    # hope of finding global optimum
-    def prims(self):
-        pass
+    # hope of finding global optimum (see _prims below). Disconnected graphs
+    # give a minimum spanning forest. heap = queue to use, a name from
+    # heaps.HEAPS. Returns (total weight, [(vertex1, vertex2, weight)])
+    def prims(self, heap="binary"):
+        return _prims(self._weighted_neighbors, self.adjacency_list, heap)
 
     # Kruskal's algroithm for finding minimum spanning tree (MST) of a graph
     # sort all edges from low weight to high and keep adding lowest edges
-    # ignoring edges which create a cycle
+    # ignoring edges which create a cycle (see _kruskal below). Returns same
+    # as prims
+    def kruskal(self):
+        return _kruskal(self._weighted_neighbors, self.adjacency_list)
+
+
+# Prim's algorithm for any undirected weighted graph given its
+# (neighbour, weight) function. Grows the tree one vertex at a time always
+# adding the cheapest edge out of the tree. Uses an indexed priority queue
+# so each vertex is queued once and its priority lowered when a cheaper
+# edge to it is found. Time: O(e log(v))
+def _prims(neighbors, vertices, heap="binary"):
+    total = 0
+    edges = []
+    in_tree = set()
+    parent = {}
+    pq = make_heap(heap)
+
+    for root in vertices:
+        if root in in_tree:
+            continue
+        pq.enqueue(root, 0)
+
+        while len(pq):
+            node = pq.dequeue()
+            vertex = node.value
+            in_tree.add(vertex)
+            if vertex in parent:
+                edges.append((parent[vertex], vertex, node.priority))
+                total += node.priority
+
+            for neighbor, weight in neighbors(vertex):
+                if neighbor in in_tree:
+                    continue
+                if neighbor not in pq:
+                    pq.enqueue(neighbor, weight)
+                    parent[neighbor] = vertex
+                elif weight < pq.get_priority(neighbor):
+                    pq.decrease_key(neighbor, weight)
+                    parent[neighbor] = vertex
+
+    return total, edges
+
+
+# Kruskal's algorithm for any undirected weighted graph given its
+# (neighbour, weight) function. A disjoint set tells if both ends are
+# already joined (i.e. edge would make a cycle) in ~O(1) so time is
+# O(e log(e)) for the sort
+def _kruskal(neighbors, vertices):
+    total = 0
+    edges = []
+    done = set()
+    candidates = []
+    # each undirected edge is stored twice - only take it once
+    for vertex in vertices:
+        done.add(vertex)
+        for neighbor, weight in neighbors(vertex):
+            if neighbor not in done:
+                candidates.append((vertex, neighbor, weight))
+    candidates.sort(key=lambda edge: edge[2])
+
+    forest = DisjointSet(vertices)
+    for vertex1, vertex2, weight in candidates:
+        if forest.union(vertex1, vertex2):
+            edges.append((vertex1, vertex2, weight))
+            total += weight
+            if len(edges) == len(forest) - 1:
+                break
+
+    return total, edges
+
+
+# Adjacency matrix helpers. Unweighted matrices store each row as a bitset -
+# a python int where bit j is set if there is an edge to vertex id j - so a
+# row costs 1 bit per vertex and whole rows are combined with one |, & or ~.
+# return the ids of the set bits of a bitset, lowest first
+def _bits(bitset):
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+# BFS as bitmap matrix-vector products - the next frontier is the OR of the
+# rows of every vertex in the current frontier, minus those already seen.
+# Each level costs one big int operation per frontier vertex rather than one
+# python step per edge. Returns vertex ids level by level (lowest id first
+# within a level)
+def _bitset_bfs(rows, start, stats=None):
+    order = []
+    seen = frontier = 1 << start
+    while frontier:
+        if stats is not None:
+            stats.frontier(frontier.bit_count())
+        reached = 0
+        for i in _bits(frontier):
+            order.append(i)
+            reached |= rows[i]
+        frontier = reached & ~seen
+        seen |= frontier
+
+    return order
+
+
+# Adjacency Matrix Undirected Non Weighted Graph
+class AMUNGraph:
+    """
+    Adjacency Matrix Undirected Graph. Vertices are given integer ids and
+    each vertex's edges are stored as one bitset row of the matrix.
+    :return: Dict of vertices and their neighbours
+    """
+    def __init__(self):
+        self.ids = {}
+        self.vertices = []
+        self.rows = []
+        # ids of removed vertices - reused so the matrix does not grow
+        self.free = []
+
+    def __repr__(self):
+        return f"{ {v: list(self._neighbors(v)) for v in self.ids} }"
+
+    def __len__(self):
+        return len(self.ids)
+
+    # add a vertex (node) - takes a free id or a new row
+    def add_vertex(self, vertex):
+        if vertex not in self.ids:
+            if self.free:
+                i = self.free.pop()
+                self.vertices[i] = vertex
+            else:
+                i = len(self.vertices)
+                self.vertices.append(vertex)
+                self.rows.append(0)
+            self.ids[vertex] = i
+
+    # add an edge (connection) between vertices - O(1), duplicates ignored
+    def add_edge(self, vertex1, vertex2):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            i, j = self.ids[vertex1], self.ids[vertex2]
+            self.rows[i] |= 1 << j
+            self.rows[j] |= 1 << i
+
+    # remove an edge between vertex
+    def remove_edge(self, vertex1, vertex2):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            if not self.has_edge(vertex1, vertex2):
+                print(f"No edge found between {vertex1} and {vertex2}.")
+                return
+            i, j = self.ids[vertex1], self.ids[vertex2]
+            self.rows[i] &= ~(1 << j)
+            self.rows[j] &= ~(1 << i)
+
+    # remove a vertex (including all its edges) - O(degree)
+    def remove_vertex(self, vertex):
+        if vertex in self.ids:
+            i = self.ids.pop(vertex)
+            for j in _bits(self.rows[i]):
+                self.rows[j] &= ~(1 << i)
+            self.rows[i] = 0
+            self.vertices[i] = None
+            self.free.append(i)
+
+    # check for an edge - O(1)
+    def has_edge(self, vertex1, vertex2):
+        if vertex1 not in self.ids or vertex2 not in self.ids:
+            return False
+        return bool(self.rows[self.ids[vertex1]] >> self.ids[vertex2] & 1)
+
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return (self.vertices[j] for j in _bits(self.rows[self.ids[vertex]]))
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(self.rows[self.ids[v]].bit_count() for v in vertices)
+
+    # build a graph from an iterable of (vertex1, vertex2) edges - O(1) each
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        for edge in edges:
+            vertex1, vertex2 = edge[0], edge[1]
+            graph.add_vertex(vertex1)
+            graph.add_vertex(vertex2)
+            graph.add_edge(vertex1, vertex2)
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, False, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below)
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(
+            {v: list(self._neighbors(v)) for v in self.ids})
+
+    # DFS - Recursively - same as the adjacency list graphs
+    def dfs_rec(self, vertex):
+        vertex_list = []
+        vertex_visited = {}
+
+        # helper function called recursively
+        def traverse(ver):
+            if ver in vertex_visited and vertex_visited[ver]:
+                return
+            vertex_visited[ver] = True
+            vertex_list.append(ver)
+            for v in self._neighbors(ver):
+                traverse(v)
+
+        traverse(vertex)
+        return vertex_list
+
+    # DFS - Iteratively - same as the adjacency list graphs
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        vertex_visited = []
+        seen = {vertex}
+        vertices_in_stack = Stack()
+        vertices_in_stack.push(vertex)
+
+        while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
+            current = vertices_in_stack.pop()
+            vertex_visited.append(current)
+
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_stack.push(v)
+
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
+        return vertex_visited
+
+    # Breadth First - level by level using bitmap frontiers (see _bitset_bfs)
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        order = _bitset_bfs(self.rows, self.ids[vertex], stats)
+        if stats is not None:
+            stats.traversal(len(order), sum(self.rows[i].bit_count() for i
+                                            in order))
+            stats.stop()
+        return [self.vertices[i] for i in order]
+
+    # Generators - same as the adjacency list graphs
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # Bidirectional BFS - same as the adjacency list graphs. Returns [] if
+    # no path
+    def bidirectional_bfs(self, vertex, destination):
+        return _bidirectional_bfs(self._neighbors, self._neighbors, vertex,
+                                  destination)
+
+
+# Adjacency Matrix Directed Non Weighted Graph
+class AMDNGraph:
+    """
+    Adjacency Matrix Directed Graph. Vertices are given integer ids and
+    each vertex's outgoing edges are stored as one bitset row of the matrix.
+    :return: Dict of vertices and their neighbours
+    """
+    def __init__(self):
+        self.ids = {}
+        self.vertices = []
+        self.rows = []
+        # ids of removed vertices - reused so the matrix does not grow
+        self.free = []
+
+    def __repr__(self):
+        return f"{ {v: list(self._neighbors(v)) for v in self.ids} }"
+
+    def __len__(self):
+        return len(self.ids)
+
+    # add a vertex (node) - takes a free id or a new row
+    def add_vertex(self, vertex):
+        if vertex not in self.ids:
+            if self.free:
+                i = self.free.pop()
+                self.vertices[i] = vertex
+            else:
+                i = len(self.vertices)
+                self.vertices.append(vertex)
+                self.rows.append(0)
+            self.ids[vertex] = i
+
+    # add an edge (connection) from vertex1 to vertex2 - O(1)
+    def add_edge(self, vertex1, vertex2):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            self.rows[self.ids[vertex1]] |= 1 << self.ids[vertex2]
+
+    # remove an edge between vertex
+    def remove_edge(self, vertex1, vertex2):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            if not self.has_edge(vertex1, vertex2):
+                print(f"No edge found between {vertex1} and {vertex2}.")
+                return
+            self.rows[self.ids[vertex1]] &= ~(1 << self.ids[vertex2])
+
+    # remove a vertex (including all its edges) - edges into the vertex can
+    # be in any row so every row has its bit cleared - O(v)
+    def remove_vertex(self, vertex):
+        if vertex in self.ids:
+            i = self.ids.pop(vertex)
+            mask = ~(1 << i)
+            self.rows = [row & mask for row in self.rows]
+            self.rows[i] = 0
+            self.vertices[i] = None
+            self.free.append(i)
+
+    # check for an edge - O(1)
+    def has_edge(self, vertex1, vertex2):
+        if vertex1 not in self.ids or vertex2 not in self.ids:
+            return False
+        return bool(self.rows[self.ids[vertex1]] >> self.ids[vertex2] & 1)
+
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return (self.vertices[j] for j in _bits(self.rows[self.ids[vertex]]))
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(self.rows[self.ids[v]].bit_count() for v in vertices)
+
+    # return vertices with an edge to vertex - a column of the matrix, so
+    # the bit is checked in every row - O(v)
+    def _predecessors(self, vertex):
+        bit = 1 << self.ids[vertex]
+        return [self.vertices[j] for j, row in enumerate(self.rows)
+                if row & bit]
+
+    # build a graph from an iterable of (vertex1, vertex2) edges - O(1) each
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        for edge in edges:
+            vertex1, vertex2 = edge[0], edge[1]
+            graph.add_vertex(vertex1)
+            graph.add_vertex(vertex2)
+            graph.add_edge(vertex1, vertex2)
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, False, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below)
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(
+            {v: list(self._neighbors(v)) for v in self.ids}, directed=True)
+
+    # DFS - Recursively - same as the adjacency list graphs
+    def dfs_rec(self, vertex):
+        vertex_list = []
+        vertex_visited = {}
+
+        # helper function called recursively
+        def traverse(ver):
+            if ver in vertex_visited and vertex_visited[ver]:
+                return
+            vertex_visited[ver] = True
+            vertex_list.append(ver)
+            for v in self._neighbors(ver):
+                traverse(v)
+
+        traverse(vertex)
+        return vertex_list
+
+    # DFS - Iteratively - same as the adjacency list graphs
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        vertex_visited = []
+        seen = {vertex}
+        vertices_in_stack = Stack()
+        vertices_in_stack.push(vertex)
+
+        while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
+            current = vertices_in_stack.pop()
+            vertex_visited.append(current)
+
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_stack.push(v)
+
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
+        return vertex_visited
+
+    # Breadth First - level by level using bitmap frontiers (see _bitset_bfs)
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        order = _bitset_bfs(self.rows, self.ids[vertex], stats)
+        if stats is not None:
+            stats.traversal(len(order), sum(self.rows[i].bit_count() for i
+                                            in order))
+            stats.stop()
+        return [self.vertices[i] for i in order]
+
+    # Generators - same as the adjacency list graphs
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # Bidirectional BFS - same as ALDNGraph, searching backwards from
+    # destination along reversed edges (see _predecessors). Returns [] if
+    # no path
+    def bidirectional_bfs(self, vertex, destination):
+        return _bidirectional_bfs(self._neighbors, self._predecessors, vertex,
+                                  destination)
+
+
+# Adjacency Matrix Undirected Weighted Graph
+class AMUWGraph:
+    """
+    Adjacency Matrix Undirected Weighted. Vertices are given integer ids,
+    edge weights are stored in a list row per vertex (inf = no edge, weights
+    kept exactly as added like ALUWGraph) with a bitset row per vertex for
+    fast neighbour lookups and traversal.
+    :return: Dict of vertices and their neighbours with weights
+    """
+    def __init__(self):
+        self.ids = {}
+        self.vertices = []
+        self.rows = []
+        self.weights = []
+        # ids of removed vertices - reused so the matrix does not grow
+        self.free = []
+        # optional vertex => position e.g. (x, y) or (lat, lon) used by astar
+        self.coordinates = {}
+
+    def __repr__(self):
+        return f"{ {v: dict(self._weighted_neighbors(v)) for v in self.ids} }"
+
+    def __len__(self):
+        return len(self.ids)
+
+    # add an entire matrix (dict of vertex => {neighbour: weight}) to graph
+    def add_matrix(self, dict):
+        for k in dict.keys():
+            self.add_vertex(k)
+        for k, v in dict.items():
+            for i, j in v.items():
+                self.add_edge(k, i, j)
+
+    # add a vertex (node) - takes a free id or adds a row and a column.
+    # Optionally with its coordinates for astar
+    def add_vertex(self, vertex, coordinates=None):
+        if vertex not in self.ids:
+            if self.free:
+                i = self.free.pop()
+                self.vertices[i] = vertex
+            else:
+                i = len(self.vertices)
+                self.vertices.append(vertex)
+                self.rows.append(0)
+                for row in self.weights:
+                    row.append(math.inf)
+                self.weights.append([math.inf] * (i + 1))
+            self.ids[vertex] = i
+        if coordinates is not None:
+            self.coordinates[vertex] = coordinates
+
+    # set the position of a vertex e.g. (x, y) or (lat, lon) for astar
+    def set_coordinates(self, vertex, coordinates):
+        if vertex in self.ids:
+            self.coordinates[vertex] = coordinates
+
+    # add an edge (connection) between vertices - O(1), an existing edge
+    # keeps its weight like ALUWGraph
+    def add_edge(self, vertex1, vertex2, weight):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            if self.has_edge(vertex1, vertex2):
+                return
+            i, j = self.ids[vertex1], self.ids[vertex2]
+            self.rows[i] |= 1 << j
+            self.rows[j] |= 1 << i
+            self.weights[i][j] = self.weights[j][i] = weight
+
+    # remove an edge between vertex
+    def remove_edge(self, vertex1, vertex2):
+        if vertex1 in self.ids and vertex2 in self.ids:
+            if not self.has_edge(vertex1, vertex2):
+                print(f"No edge found between {vertex1} and {vertex2}.")
+                return
+            i, j = self.ids[vertex1], self.ids[vertex2]
+            self.rows[i] &= ~(1 << j)
+            self.rows[j] &= ~(1 << i)
+            self.weights[i][j] = self.weights[j][i] = math.inf
+
+    # remove a vertex (including all its edges) - O(degree)
+    def remove_vertex(self, vertex):
+        if vertex in self.ids:
+            i = self.ids.pop(vertex)
+            for j in _bits(self.rows[i]):
+                self.rows[j] &= ~(1 << i)
+                self.weights[i][j] = self.weights[j][i] = math.inf
+            self.rows[i] = 0
+            self.vertices[i] = None
+            self.free.append(i)
+            self.coordinates.pop(vertex, None)
+
+    # check for an edge - O(1)
+    def has_edge(self, vertex1, vertex2):
+        if vertex1 not in self.ids or vertex2 not in self.ids:
+            return False
+        return bool(self.rows[self.ids[vertex1]] >> self.ids[vertex2] & 1)
+
+    # return weight of an edge - None if no edge - O(1)
+    def get_weight(self, vertex1, vertex2):
+        if not self.has_edge(vertex1, vertex2):
+            return None
+        return self.weights[self.ids[vertex1]][self.ids[vertex2]]
+
+    # return neighbours of a vertex
+    def _neighbors(self, vertex):
+        return (self.vertices[j] for j in _bits(self.rows[self.ids[vertex]]))
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        return sum(self.rows[self.ids[v]].bit_count() for v in vertices)
+
+    # return (neighbour, weight) pairs of a vertex
+    def _weighted_neighbors(self, vertex):
+        i = self.ids[vertex]
+        row = self.weights[i]
+        return ((self.vertices[j], row[j]) for j in _bits(self.rows[i]))
+
+    # build a graph from an iterable of (vertex1, vertex2, weight) edges -
+    # O(1) each
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        for vertex1, vertex2, weight in edges:
+            graph.add_vertex(vertex1)
+            graph.add_vertex(vertex2)
+            graph.add_edge(vertex1, vertex2, weight)
+
+        return graph
+
+    # load a graph from an edge list file (see read_edge_list). binary=True
+    # reads the binary format (see read_binary_edges) instead
+    @classmethod
+    def load_edge_list(cls, path, delimiter=None, vertex_type=str,
+                       binary=False):
+        return cls.from_edges(_edge_file(path, True, delimiter, vertex_type,
+                                         binary))
+
+    # freeze graph into a read only CSR graph (see CSRGraph below)
+    def freeze(self):
+        return CSRGraph.from_adjacency_list(
+            {v: dict(self._weighted_neighbors(v)) for v in self.ids})
+
+    # DFS - Recursively - same as the adjacency list graphs
+    def dfs_rec(self, vertex):
+        vertex_list = []
+        vertex_visited = {}
+
+        # helper function called recursively
+        def traverse(ver):
+            if ver in vertex_visited and vertex_visited[ver]:
+                return
+            vertex_visited[ver] = True
+            vertex_list.append(ver)
+            for v in self._neighbors(ver):
+                traverse(v)
+
+        traverse(vertex)
+        return vertex_list
+
+    # DFS - Iteratively - same as the adjacency list graphs
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        vertex_visited = []
+        seen = {vertex}
+        vertices_in_stack = Stack()
+        vertices_in_stack.push(vertex)
+
+        while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
+            current = vertices_in_stack.pop()
+            vertex_visited.append(current)
+
+            for v in self._neighbors(current):
+                if v not in seen:
+                    seen.add(v)
+                    vertices_in_stack.push(v)
+
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
+        return vertex_visited
+
+    # Breadth First - level by level using bitmap frontiers (see _bitset_bfs)
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        order = _bitset_bfs(self.rows, self.ids[vertex], stats)
+        if stats is not None:
+            stats.traversal(len(order), sum(self.rows[i].bit_count() for i
+                                            in order))
+            stats.stop()
+        return [self.vertices[i] for i in order]
+
+    # Generators - same as the adjacency list graphs
+    def iter_bfs(self, vertex, max_depth=None, limit=None):
+        return _iter_bfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_dfs(self, vertex, max_depth=None, limit=None):
+        return _iter_dfs(self._neighbors, vertex, max_depth, limit)
+
+    def iter_paths(self, vertex, destination, max_depth=None, limit=None):
+        return _iter_paths(self._neighbors, vertex, destination, max_depth,
+                           limit)
+
+    # Dijkstra's algorithm - same as ALUWGraph. Returns (distance, path)
+    def dijkstra(self, start, end, bidirectional=False, stats=None,
+                 heap="binary"):
+        if start not in self.ids or end not in self.ids:
+            return math.inf, []
+        if bidirectional:
+            return bidirectional_dijkstra_search(self._weighted_neighbors,
+                                                 self._weighted_neighbors,
+                                                 start, end, stats, heap)
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              [end], stats=stats, heap=heap)
+        return distances.get(end, math.inf), build_path(previous, end)
+
+    # Dijkstra's algorithm - shortest distance from start to every vertex it
+    # can reach. Returns dicts (distances, previous) like ALUWGraph
+    def dijkstra_all(self, start, stats=None, heap="binary"):
+        if start not in self.ids:
+            return {}, {}
+
+        return dijkstra_search(self._weighted_neighbors, start, stats=stats,
+                               heap=heap)
+
+    # Dijkstra's algorithm - shortest paths from start to several targets in
+    # one search. Returns dict of target => (distance, path)
+    def dijkstra_many(self, start, targets, stats=None, heap="binary"):
+        targets = list(targets)
+        if start not in self.ids:
+            return {t: (math.inf, []) for t in targets}
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              targets, stats=stats, heap=heap)
+        return {t: (distances.get(t, math.inf), build_path(previous, t))
+                for t in targets}
+
+    # A* search - same as ALUWGraph, using the coordinates given to
+    # add_vertex/ set_coordinates. Returns (distance, path)
+    def astar(self, start, goal, heuristic="euclidean", stats=None,
+              heap="binary"):
+        if start not in self.ids or goal not in self.ids:
+            return math.inf, []
+
+        if not callable(heuristic):
+            heuristic = HEURISTICS[heuristic]
+        coordinates = self.coordinates
+        goal_coordinates = coordinates.get(goal)
+
+        def estimate(vertex):
+            if goal_coordinates is None or vertex not in coordinates:
+                return 0
+            return heuristic(coordinates[vertex], goal_coordinates)
+
+        distances, previous = dijkstra_search(self._weighted_neighbors, start,
+                                              [goal], estimate, stats, heap)
+        return distances.get(goal, math.inf), build_path(previous, goal)
+
+    # minimum spanning tree/ forest - same as ALUWGraph
+    def prims(self, heap="binary"):
+        return _prims(self._weighted_neighbors, self.ids, heap)
+
     def kruskal(self):
-        pass
+        return _kruskal(self._weighted_neighbors, self.ids)
+
+
+# return (neighbour, weight) pairs for either adjacency list layout above -
+# list of vertices (weight None) or dict of neighbour => weight
+def _edge_pairs(edges):
+    if isinstance(edges, dict):
+        return edges.items()
+    return ((e, None) for e in edges)
+
+
+# Snapshot header - magic, version, flags (1 = directed, 2 = weighted,
+# 4 = vertex table is an int64 array rather than JSON), bytes per target
+# id, vertex count, edge count, vertex table size
+_SNAPSHOT_MAGIC = b"ALGRAPH\0"
+_SNAPSHOT_HEADER = struct.Struct("<8sIIqqqq")
+_SNAPSHOT_VERSION = 2
+
+
+# vertex table of a snapshot - (bytes, True) if every vertex is an int
+# which fits in 8 bytes (stored as an array, no parsing to reopen),
+# otherwise (JSON, False)
+def _snapshot_labels(vertices):
+    if all(type(v) is int for v in vertices):
+        try:
+            return array("q", vertices), True
+        except OverflowError:
+            pass
+    return json.dumps(list(vertices)).encode(), False
+
+
+# JSON has no tuples - turn lists back into (hashable) tuples
+def _snapshot_vertex(vertex):
+    if isinstance(vertex, list):
+        return tuple(_snapshot_vertex(v) for v in vertex)
+    return vertex
+
+
+# Compressed Sparse Row (CSR) Graph - frozen (read only) form of the
+# adjacency list graphs above. Vertices are given integer ids 0..n-1 and all
+# edges are packed into flat arrays: offsets (where each vertex's edges
+# start), targets (id of the vertex at the other end of the edge) and
+# weights. The edges of vertex i are targets[offsets[i]:offsets[i+1]].
+# Each edge costs 4-16 bytes rather than a list slot + dict (hundreds of
+# bytes) and a vertex's edges sit next to each other in memory so
+# traversals are much faster. Undirected edges are stored in both directions.
+# Big O: Build O(v + e), find neighbours O(1) + O(degree). Vertices and edges
+# cannot be added or removed - freeze the graph again instead.
+class CSRGraph:
+    """
+    Compressed Sparse Row Graph. Read only graph which stores vertices as
+    integer ids and edges in flat offset/ target/ weight arrays.
+    :return: Dict of vertices and their neighbours
+    """
+    def __init__(self, vertices, offsets, targets, weights=None,
+                 directed=False, file=None):
+        self.vertices = vertices
+        # vertex => id, built on first use (see ids)
+        self._ids = None
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+        # memory mapped snapshot the arrays point into and its path (see open)
+        self.file = file
+        self.path = None
+
+    def __repr__(self):
+        return f"{ {v: list(self.neighbors(v)) for v in self.vertices} }"
+
+    def __len__(self):
+        return len(self.vertices)
+
+    # vertex => integer id dict - only built the first time a vertex is
+    # looked up by label, so opening a snapshot does not pay O(v) for it
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self.vertices)}
+        return self._ids
+
+    # build from an ALUN, ALDN or ALUW adjacency list
+    @classmethod
+    def from_adjacency_list(cls, adjacency_list, directed=False):
+        vertices = list(adjacency_list)
+        ids = {v: i for i, v in enumerate(vertices)}
+        offsets = array("q", [0])
+        # 4 byte ids unless too many vertices to fit
+        targets = array("i" if len(vertices) < 2 ** 31 else "q")
+        weights = array("d")
+        weighted = False
+
+        for v in vertices:
+            for neighbor, weight in _edge_pairs(adjacency_list[v]):
+                targets.append(ids[neighbor])
+                if weight is not None:
+                    weighted = True
+                weights.append(1 if weight is None else weight)
+            offsets.append(len(targets))
+
+        return cls(vertices, offsets, targets, weights if weighted else None,
+                   directed)
+
+    # build straight from an iterable of (vertex1, vertex2[, weight]) edges
+    # with no adjacency list in between. Edge ends are collected in flat
+    # arrays, counted per vertex to get the offsets and then dropped into
+    # place (a counting sort, keeps edge order). Duplicate edges are removed
+    # one vertex at a time at the end. Time: O(v + e)
+    @classmethod
+    def from_edges(cls, edges, directed=False, weighted=False):
+        ids = {}
+        vertices = []
+        sources, ends, edge_weights = array("q"), array("q"), array("d")
+        for edge in edges:
+            for vertex in (edge[0], edge[1]):
+                if vertex not in ids:
+                    ids[vertex] = len(vertices)
+                    vertices.append(vertex)
+            vertex1, vertex2 = ids[edge[0]], ids[edge[1]]
+            sources.append(vertex1)
+            ends.append(vertex2)
+            if weighted:
+                edge_weights.append(edge[2])
+            if not directed:
+                sources.append(vertex2)
+                ends.append(vertex1)
+                if weighted:
+                    edge_weights.append(edge[2])
+
+        n = len(vertices)
+        offsets = array("q", [0]) * (n + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        slots = offsets[:-1]
+        targets = array("q", [0]) * len(sources)
+        weights = array("d", [0]) * len(sources) if weighted else None
+        for k, source in enumerate(sources):
+            targets[slots[source]] = ends[k]
+            if weighted:
+                weights[slots[source]] = edge_weights[k]
+            slots[source] += 1
+
+        # remove duplicates keeping the first of each - shifts edges left
+        kept = 0
+        for i in range(n):
+            seen = set()
+            start, offsets[i] = offsets[i], kept
+            for j in range(start, offsets[i + 1]):
+                if targets[j] not in seen:
+                    seen.add(targets[j])
+                    targets[kept] = targets[j]
+                    if weighted:
+                        weights[kept] = weights[j]
+                    kept += 1
+        offsets[n] = kept
+        del targets[kept:]
+        if weighted:
+            del weights[kept:]
+        if n < 2 ** 31:
+            targets = array("i", targets)
+
+        return cls(vertices, offsets, targets, weights, directed)
+
+    # load from an edge list file (see read_edge_list/ read_binary_edges)
+    @classmethod
+    def load_edge_list(cls, path, directed=False, weighted=False,
+                       delimiter=None, vertex_type=str, binary=False):
+        return cls.from_edges(_edge_file(path, weighted, delimiter,
+                                         vertex_type, binary), directed,
+                              weighted)
+
+    # Snapshots - save to a compact binary file which can be reopened with
+    # no parsing or copying. Layout (little endian, arrays 8 byte aligned):
+    # header | vertex table | offsets | targets | weights.
+    # open memory maps the file and the arrays become views straight into
+    # it, so any number of processes share one read only copy through the
+    # OS page cache. Integer vertices are stored as an array too, so
+    # reopening is O(1) whatever the size. Other vertices (strings, floats
+    # or tuples of them) are stored as JSON which each open has to decode.
+    # labels=False stores the ids 0..n-1 instead of the vertices (any label
+    # type, e.g. a file only for searches on the arrays)
+    def save(self, path, labels=True):
+        table, numeric = _snapshot_labels(
+            self.vertices if labels else range(len(self.vertices)))
+        weighted = self.weights is not None
+        flags = self.directed | weighted << 1 | numeric << 2
+        with open(path, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, flags,
+                self.targets.itemsize, len(self.vertices), len(self.targets),
+                len(table) * (8 if numeric else 1)))
+            f.write(table)
+            f.write(bytes(-f.tell() % 8))
+            f.write(self.offsets)
+            f.write(self.targets)
+            f.write(bytes(-f.tell() % 8))
+            if weighted:
+                f.write(self.weights)
+
+    # reopen a snapshot saved with save - read only. labels=False skips the
+    # vertex table and uses the ids 0..n-1 as vertices (all that searches on
+    # the arrays need e.g. worker processes)
+    @classmethod
+    def open(cls, path, labels=True):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _SNAPSHOT_HEADER.size or \
+                mapped[:8] != _SNAPSHOT_MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a graph snapshot.")
+        magic, version, flags, itemsize, n, m, size = \
+            _SNAPSHOT_HEADER.unpack_from(mapped)
+        if version not in (1, _SNAPSHOT_VERSION):
+            mapped.close()
+            raise ValueError(f"Unsupported graph snapshot version {version}.")
+
+        view = memoryview(mapped)
+        position = _SNAPSHOT_HEADER.size
+        if not labels:
+            vertices = range(n)
+        elif flags & 4:
+            vertices = view[position:position + size].cast("q")
+        else:
+            vertices = [_snapshot_vertex(v) for v in
+                        json.loads(view[position:position + size].tobytes())]
+        position += size + -(position + size) % 8
+        offsets = view[position:position + (n + 1) * 8].cast("q")
+        position += (n + 1) * 8
+        targets = view[position:position + m * itemsize].cast(
+            "i" if itemsize == 4 else "q")
+        position += m * itemsize + -(m * itemsize) % 8
+        weights = view[position:position + m * 8].cast("d") if flags & 2 \
+            else None
+
+        graph = cls(vertices, offsets, targets, weights, bool(flags & 1),
+                    mapped)
+        graph.path = path
+        return graph
+
+    # release a memory mapped snapshot - the graph cannot be used after
+    def close(self):
+        if self.file is not None:
+            for a in (self.vertices, self.offsets, self.targets,
+                      self.weights):
+                if isinstance(a, memoryview):
+                    a.release()
+            self.file.close()
+            self.file = None
+
+    # Multi source distances - shortest distance from each source to every
+    # vertex (Dijkstra, or BFS edge counts if unweighted) as a
+    # path_algorithms.DistanceMatrix (matrix[source, vertex]). Sources are
+    # split across a pool of worker processes which all memory map the same
+    # read only snapshot (saved to a temporary file without the vertex labels
+    # unless the graph was opened from one) so the graph is never copied or
+    # pickled per worker. Sources are turned into ids and the rows labelled
+    # here, workers only see ids. workers=1 runs in this process. path
+    # memory maps the result to a file
+    def multi_source_distances(self, sources, workers=None, path=None):
+        sources = list(sources)
+        source_ids = [self.ids[s] for s in sources]
+        matrix = DistanceMatrix.empty(self.vertices, path, sources)
+        n = len(self.vertices)
+
+        if workers == 1 or len(sources) < 2:
+            rows = (csr_distances(self.offsets, self.targets, self.weights, i)
+                    for i in source_ids)
+            for k, row in enumerate(rows):
+                matrix.data[k * n:(k + 1) * n] = row
+            return matrix
+
+        snapshot, temp = self.path, None
+        if snapshot is None:
+            handle, temp = tempfile.mkstemp(suffix=".graph")
+            os.close(handle)
+            self.save(temp, labels=False)
+            snapshot = temp
+        try:
+            with ProcessPoolExecutor(workers, initializer=_snapshot_init,
+                                     initargs=(snapshot,)) as pool:
+                rows = pool.map(_snapshot_distances, source_ids, chunksize=max(
+                    1, len(sources) // (4 * (workers or os.cpu_count() or 1))))
+                for k, row in enumerate(rows):
+                    matrix.data[k * n:(k + 1) * n] = row
+        finally:
+            if temp is not None:
+                os.remove(temp)
+
+        return matrix
+
+    # number of edges stored (undirected edges count twice)
+    def edge_count(self):
+        return len(self.targets)
+
+    # return neighbours of a vertex
+    def neighbors(self, vertex):
+        i = self.ids[vertex]
+        return (self.vertices[self.targets[j]] for j in
+                range(self.offsets[i], self.offsets[i + 1]))
+
+    # total number of edges out of some vertices (see SearchStats)
+    def _degrees(self, vertices):
+        offsets = self.offsets
+        return sum(offsets[i + 1] - offsets[i] for i in
+                   map(self.ids.__getitem__, vertices))
+
+    # DFS - Iteratively - same order as the adjacency list graphs but works
+    # on integer ids with a flag array for visited/ already stacked vertices
+    def dfs_iter(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        offsets, targets = self.offsets, self.targets
+        vertex_visited = []
+        seen = bytearray(len(self.vertices))
+        vertices_in_stack = Stack()
+        start = self.ids[vertex]
+        vertices_in_stack.push(start)
+        seen[start] = 1
+
+        while len(vertices_in_stack) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_stack))
+            current = vertices_in_stack.pop()
+            vertex_visited.append(self.vertices[current])
 
+            for j in range(offsets[current], offsets[current + 1]):
+                v = targets[j]
+                if not seen[v]:
+                    seen[v] = 1
+                    vertices_in_stack.push(v)
+
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
+        return vertex_visited
+
+    # Breadth First - same logic as DFS (iter) but queues instead of stacks
+    def bfs(self, vertex, stats=None):
+        if stats is not None:
+            stats.start()
+        offsets, targets = self.offsets, self.targets
+        vertex_visited = []
+        seen = bytearray(len(self.vertices))
+        vertices_in_queue = Queue()
+        start = self.ids[vertex]
+        vertices_in_queue.enqueue(start)
+        seen[start] = 1
+
+        while len(vertices_in_queue) > 0:
+            if stats is not None:
+                stats.frontier(len(vertices_in_queue))
+            current = vertices_in_queue.dequeue()
+            vertex_visited.append(self.vertices[current])
+
+            for j in range(offsets[current], offsets[current + 1]):
+                v = targets[j]
+                if not seen[v]:
+                    seen[v] = 1
+                    vertices_in_queue.enqueue(v)
+
+        if stats is not None:
+            stats.traversal(len(vertex_visited),
+                            self._degrees(vertex_visited))
+            stats.stop()
+        return vertex_visited
+
+    # Dijkstra's algorithm - shortest path between two vertices. Unweighted
+    # graphs count every edge as 1. heap = queue to use, a name from
+    # heaps.HEAPS. Returns (distance, path) like ALUWGraph
+    def dijkstra(self, start, end, stats=None, heap="binary"):
+        if stats is not None:
+            stats.start()
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        source, target = self.ids[start], self.ids[end]
+        distances = array("d", [math.inf]) * len(self.vertices)
+        previous = array("q", [-1]) * len(self.vertices)
+        distances[source] = 0
+
+        # only the start is queued - others are added as they are reached.
+        # Indexed so a vertex already queued has its priority lowered
+        pq = make_heap(heap, stats)
+        pq.enqueue(source, 0)
+
+        while len(pq):
+            node = pq.dequeue().value
+            if node == target:
+                break
+            if stats is not None:
+                stats.expanded += 1
+                stats.relaxed += offsets[node + 1] - offsets[node]
+
+            for j in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[j]
+                candidate = distances[node] + (1 if weights is None else
+                                               weights[j])
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    pq.enqueue(neighbor, candidate)
+
+        path = []
+        if distances[target] != math.inf:
+            node = target
+            while node != -1:
+                path.append(self.vertices[node])
+                node = previous[node]
+
+        if stats is not None:
+            stats.stop()
+        return distances[target], path[::-1]
+
+    # Centrality - importance score of every vertex (see centrality.py),
+    # computed straight on the CSR arrays. Returns dict of vertex => score
+    def degree_centrality(self, direction="out"):
+        return dict(zip(self.vertices, degree_centrality(
+            self.offsets, self.targets, direction if self.directed else
+            "out")))
+
+    def closeness_centrality(self):
+        return dict(zip(self.vertices, closeness_centrality(
+            self.offsets, self.targets, self.weights, self.directed)))
+
+    # sources limits the searches to some vertices (faster estimate)
+    def betweenness_centrality(self, normalized=True, sources=None):
+        if sources is not None:
+            sources = [self.ids[v] for v in sources]
+        return dict(zip(self.vertices, betweenness_centrality(
+            self.offsets, self.targets, self.weights, self.directed,
+            normalized, sources)))
+
+    # PageRank - edge weights are ignored
+    def pagerank(self, damping=0.85, tol=1e-6, max_iter=100):
+        return dict(zip(self.vertices, pagerank(
+            self.offsets, self.targets, damping, tol, max_iter)))
+
+
+# worker process state for multi_source_distances - each worker opens the
+# snapshot once when it starts. Only the edge arrays are used so the vertex
+# table is never read
+_snapshot_graph = None
+
+
+def _snapshot_init(path):
+    global _snapshot_graph
+    _snapshot_graph = CSRGraph.open(path, labels=False)
+
+
+def _snapshot_distances(source):
+    graph = _snapshot_graph
+    return csr_distances(graph.offsets, graph.targets, graph.weights, source)
+
+
+# aldn = ALDNGraph()
+# aldn.add_vertex("a")
+# aldn.add_vertex("b")
+# aldn.add_vertex("c")
+# aldn.add_edge("a", "b")
+# aldn.add_edge("b", "c")
+# aldn.add_edge("a", "c")
+# print(aldn.path_finder_dfs_rec("a", "c"))  # [['a', 'b', 'c'], ['a', 'c']]
+# print(aldn.path_finder_dfs_rec("a", "c", max_length=1))  # [['a', 'c']]
+# print(aldn.path_finder_dfs_rec("a", "b", max_length=0))  # []
+# print(aldn.path_finder_dfs_rec("a", "c", max_paths=0))  # []
 
 # aluw = ALUWGraph()
 # aluw.add_vertex("A")
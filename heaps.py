@@ -0,0 +1,433 @@
+# Heaps - min priority queues built different ways, all with the same
+# interface as IndexedMinPQ (see priority_queue.py) so they can be swapped
+# for each other e.g. make_heap("pairing") or dijkstra_search(heap=...):
+#   enqueue(value, priority) - add a value (an already queued value has its
+#       priority lowered if the new one is smaller)
+#   dequeue() - remove and return the lowest priority Node (None if empty)
+#   peek(), decrease_key(value, priority), get_priority(value),
+#   len(heap), value in heap
+#   from_pairs(pairs), push_many(pairs), pop_many(k) - batches like MinPQ
+# Values must be hashable and are queued at most once.
+# Big O (amortised):      enqueue     dequeue        decrease key
+#   binary (IndexedMinPQ) O(log n)    O(log n)       O(log n)
+#   d-ary (DaryHeap)      O(log_d n)  O(d log_d n)   O(log_d n)
+#   pairing               O(1)        O(log n)       o(log n)
+#   fibonacci             O(1)        O(log n)       O(1)
+# Uses: Dijkstra and Prim's do up to one decrease key per edge but only
+# one dequeue per vertex, so heaps with cheaper decrease keys (and
+# shallower d-ary trees) can win on graphs with many more edges than
+# vertices. Which is quickest in practice depends on the mix of operations
+# and Python overheads rather than Big O - see benchmarks.bench_heaps.
+from priority_queue import Node, IndexedMinPQ
+
+
+# d-ary heap - an indexed min heap where each parent has d children rather
+# than 2. Tree is log_d(n) deep so sifting up (enqueue, decrease key) is
+# quicker, sifting down looks at d children a level. d = 4 is a common
+# sweet spot. Child => parent = (n-1)//d, parent => children d*n+1..d*n+d
+class DaryHeap(IndexedMinPQ):
+    """
+    d-ary Min Heap. Indexed min priority queue with d children per parent.
+    :return: List of nodes contained in the heap
+    """
+    def __init__(self, d=4, stats=None):
+        super().__init__(stats)
+        if d < 2:
+            raise ValueError(f"A heap needs at least 2 children, not {d}.")
+        self.d = d
+
+    # move item at index up until parent is smaller
+    def _sift_up(self, index):
+        priorities, d = self.priorities, self.d
+        while index > 0:
+            parent_index = (index - 1) // d
+            if priorities[index] < priorities[parent_index]:
+                self._swap(index, parent_index)
+                index = parent_index
+            else:
+                break
+
+    # move item at index down until all d children are bigger
+    def _sift_down(self, index):
+        priorities, d = self.priorities, self.d
+        length = len(priorities)
+        while True:
+            smallest = index
+            first = d * index + 1
+            for child in range(first, min(first + d, length)):
+                if priorities[child] < priorities[smallest]:
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+
+class _PairingNode:
+    __slots__ = ("value", "priority", "child", "sibling", "prev")
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+        # leftmost child, next sibling to the right and the node to the
+        # left (previous sibling, or the parent for a leftmost child)
+        self.child = self.sibling = self.prev = None
+
+
+# Pairing heap - a tree where each node keeps a list of child trees. Two
+# heaps merge in O(1) by making the bigger root a child of the smaller.
+# Enqueue merges in a one node heap, decrease key cuts the node's subtree
+# off and merges it back in. Dequeue removes the root and merges its
+# children in two passes (pairs left to right, then right to left) which
+# keeps the tree from getting too wide.
+class PairingHeap:
+    """
+    Pairing Min Heap. Tree of nodes merged in pairs, lowest priority at the
+    root and O(1) enqueue.
+    :return: List of nodes contained in the heap
+    """
+    def __init__(self, stats=None):
+        self.root = None
+        self.nodes = {}
+        # optional search_stats.SearchStats counting pushes/ pops
+        self.stats = stats
+
+    def __repr__(self):
+        return f"{self.get_all_nodes()}"
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, value):
+        return value in self.nodes
+
+    # returns a list of all nodes as tuples (data, priority) - any order
+    def get_all_nodes(self):
+        return [(n.value, n.priority) for n in self.nodes.values()]
+
+    # return the priority of a queued value
+    def get_priority(self, value):
+        return self.nodes[value].priority
+
+    # return (without removing) the node that dequeue would return
+    def peek(self):
+        if self.root is None:
+            return None
+        return Node(self.root.value, self.root.priority)
+
+    # build a heap from (value, priority) pairs - enqueue is already O(1)
+    # so this is one enqueue per pair, O(n)
+    @classmethod
+    def from_pairs(cls, pairs, stats=None):
+        pq = cls(stats=stats)
+        pq.push_many(pairs)
+        return pq
+
+    # enqueue many (value, priority) pairs - same rules as enqueue, O(k)
+    def push_many(self, pairs):
+        for value, priority in pairs:
+            self.enqueue(value, priority)
+
+    # dequeue the k lowest priority nodes - returned in order
+    def pop_many(self, k):
+        return [self.dequeue() for _ in range(min(k, len(self.nodes)))]
+
+    # make the root with the bigger priority the leftmost child of the other
+    @staticmethod
+    def _merge(a, b):
+        if b.priority < a.priority:
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        return a
+
+    # enqueue a new value - an already queued value has its priority lowered
+    # if the new one is smaller
+    def enqueue(self, value, priority):
+        if value in self.nodes:
+            if priority < self.nodes[value].priority:
+                self.decrease_key(value, priority)
+            return
+
+        node = _PairingNode(value, priority)
+        self.nodes[value] = node
+        self.root = node if self.root is None else \
+            self._merge(self.root, node)
+        if self.stats is not None:
+            self.stats.pushed(len(self.nodes))
+
+    # return (and remove) the node with the lowest priority
+    def dequeue(self):
+        root = self.root
+        if root is None:
+            return None
+        if self.stats is not None:
+            self.stats.pops += 1
+        del self.nodes[root.value]
+
+        # first pass - merge children in pairs from the left
+        pairs = []
+        child = root.child
+        while child is not None:
+            second = child.sibling
+            following = second.sibling if second is not None else None
+            child.sibling = child.prev = None
+            if second is not None:
+                second.sibling = second.prev = None
+                child = self._merge(child, second)
+            pairs.append(child)
+            child = following
+        # second pass - merge the pairs into one tree from the right
+        merged = pairs.pop() if pairs else None
+        while pairs:
+            merged = self._merge(pairs.pop(), merged)
+        self.root = merged
+
+        return Node(root.value, root.priority)
+
+    # lower the priority of a queued value - its subtree is cut off and
+    # merged back in with the root
+    def decrease_key(self, value, priority):
+        node = self.nodes[value]
+        if priority > node.priority:
+            raise ValueError(f"New priority {priority} is higher than "
+                             f"current priority {node.priority}.")
+        node.priority = priority
+        if node is self.root:
+            return
+
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.sibling = node.prev = None
+        self.root = self._merge(self.root, node)
+
+
+class _FibonacciNode:
+    __slots__ = ("value", "priority", "parent", "child", "left", "right",
+                 "degree", "marked")
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+        self.parent = self.child = None
+        # siblings in a circular doubly linked list
+        self.left = self.right = self
+        self.degree = 0
+        # lost a child since it became a child itself
+        self.marked = False
+
+
+# Fibonacci heap - a list of trees (roots in a circular linked list) with
+# a pointer to the smallest root. Enqueue just adds a one node tree.
+# Dequeue removes the smallest root, adds its children as roots then
+# consolidates - links roots of the same degree until every degree is
+# different. Decrease key cuts the node off to the root list; a parent
+# which loses a second child is cut too (cascading cut) so trees stay
+# bushy - a tree of degree k has at least Fib(k + 2) nodes.
+class FibonacciHeap:
+    """
+    Fibonacci Min Heap. Lazy list of trees giving O(1) enqueue and
+    amortised O(1) decrease key.
+    :return: List of nodes contained in the heap
+    """
+    def __init__(self, stats=None):
+        self.min = None
+        self.nodes = {}
+        # optional search_stats.SearchStats counting pushes/ pops
+        self.stats = stats
+
+    def __repr__(self):
+        return f"{self.get_all_nodes()}"
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, value):
+        return value in self.nodes
+
+    # returns a list of all nodes as tuples (data, priority) - any order
+    def get_all_nodes(self):
+        return [(n.value, n.priority) for n in self.nodes.values()]
+
+    # return the priority of a queued value
+    def get_priority(self, value):
+        return self.nodes[value].priority
+
+    # return (without removing) the node that dequeue would return
+    def peek(self):
+        if self.min is None:
+            return None
+        return Node(self.min.value, self.min.priority)
+
+    # build a heap from (value, priority) pairs - enqueue is already O(1)
+    # so this is one enqueue per pair, O(n)
+    @classmethod
+    def from_pairs(cls, pairs, stats=None):
+        pq = cls(stats=stats)
+        pq.push_many(pairs)
+        return pq
+
+    # enqueue many (value, priority) pairs - same rules as enqueue, O(k)
+    def push_many(self, pairs):
+        for value, priority in pairs:
+            self.enqueue(value, priority)
+
+    # dequeue the k lowest priority nodes - returned in order
+    def pop_many(self, k):
+        return [self.dequeue() for _ in range(min(k, len(self.nodes)))]
+
+    # add a node to the root list next to the smallest root
+    def _add_root(self, node):
+        node.parent = None
+        if self.min is None:
+            node.left = node.right = node
+            self.min = node
+            return
+        node.left = self.min
+        node.right = self.min.right
+        self.min.right.left = node
+        self.min.right = node
+        if node.priority < self.min.priority:
+            self.min = node
+
+    # take a node out of whichever circular list it is in
+    @staticmethod
+    def _unlink(node):
+        node.left.right = node.right
+        node.right.left = node.left
+        node.left = node.right = node
+
+    # enqueue a new value - an already queued value has its priority lowered
+    # if the new one is smaller
+    def enqueue(self, value, priority):
+        if value in self.nodes:
+            if priority < self.nodes[value].priority:
+                self.decrease_key(value, priority)
+            return
+
+        node = _FibonacciNode(value, priority)
+        self.nodes[value] = node
+        self._add_root(node)
+        if self.stats is not None:
+            self.stats.pushed(len(self.nodes))
+
+    # return (and remove) the node with the lowest priority
+    def dequeue(self):
+        smallest = self.min
+        if smallest is None:
+            return None
+        if self.stats is not None:
+            self.stats.pops += 1
+        del self.nodes[smallest.value]
+
+        roots = []
+        node = smallest.right
+        while node is not smallest:
+            roots.append(node)
+            node = node.right
+        child = smallest.child
+        if child is not None:
+            node = child
+            while True:
+                roots.append(node)
+                node = node.right
+                if node is child:
+                    break
+        self.min = None
+        self._consolidate(roots)
+
+        return Node(smallest.value, smallest.priority)
+
+    # link roots of equal degree (bigger root becomes a child of the
+    # smaller) until every root has a different degree, then rebuild the
+    # root list. Degree is at most log_phi(n) < 2 log_2(n)
+    def _consolidate(self, roots):
+        by_degree = [None] * (2 * len(self.nodes).bit_length() + 2)
+        for node in roots:
+            node.left = node.right = node
+            node.parent = None
+            degree = node.degree
+            while by_degree[degree] is not None:
+                other = by_degree[degree]
+                if other.priority < node.priority:
+                    node, other = other, node
+                # other becomes a child of node
+                other.parent = node
+                other.marked = False
+                if node.child is None:
+                    node.child = other
+                else:
+                    other.left = node.child
+                    other.right = node.child.right
+                    node.child.right.left = other
+                    node.child.right = other
+                node.degree += 1
+                by_degree[degree] = None
+                degree += 1
+            by_degree[degree] = node
+
+        for node in by_degree:
+            if node is not None:
+                self._add_root(node)
+
+    # lower the priority of a queued value - if it is now smaller than its
+    # parent it is cut off to the root list
+    def decrease_key(self, value, priority):
+        node = self.nodes[value]
+        if priority > node.priority:
+            raise ValueError(f"New priority {priority} is higher than "
+                             f"current priority {node.priority}.")
+        node.priority = priority
+        parent = node.parent
+        if parent is not None and priority < parent.priority:
+            self._cut(node, parent)
+            # cascading cut - a marked parent has now lost two children
+            while parent.parent is not None:
+                if not parent.marked:
+                    parent.marked = True
+                    break
+                grandparent = parent.parent
+                self._cut(parent, grandparent)
+                parent = grandparent
+        if priority < self.min.priority:
+            self.min = node
+
+    # move node from its parent's children to the root list
+    def _cut(self, node, parent):
+        if parent.child is node:
+            parent.child = node.right if node.right is not node else None
+        self._unlink(node)
+        parent.degree -= 1
+        node.marked = False
+        self._add_root(node)
+
+
+# heaps by name for make_heap/ heap= parameters
+HEAPS = {
+    "binary": IndexedMinPQ,
+    "4-ary": DaryHeap,
+    "pairing": PairingHeap,
+    "fibonacci": FibonacciHeap,
+}
+
+
+# make an empty heap by name (see HEAPS) - options are passed on e.g.
+# make_heap("4-ary", d=8) for an 8-ary heap
+def make_heap(kind="binary", stats=None, **options):
+    """
+    Create an empty min heap with the shared heap interface.
+    :param kind: Name from HEAPS ("binary", "4-ary", "pairing", "fibonacci")
+    :param stats: Optional search_stats.SearchStats counting pushes/ pops
+    :return: Heap
+    """
+    if kind not in HEAPS:
+        raise ValueError(f"Unknown heap {kind!r} - choose from "
+                         f"{', '.join(HEAPS)}.")
+    return HEAPS[kind](stats=stats, **options)
@@ -1,7 +1,878 @@
-# Dijkstra's Algorithm - see graphs for implementation
+# Dijkstra's Algorithm - graphs use the search below via their dijkstra methods
 # Provided that all of the vertices are reachable from the source vertex;
 # Dijkstra’s algorithm can be used to find the shortest distance from the
 # source vertex to all other vertices in a weighted graph. The graph can be
 # directed or undirected, cyclic or acyclic, but the weights on all edges
 # need to be non-negative.
+from priority_queue import MinPQ, IndexedMinPQ
+from heaps import make_heap
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+import math
+import mmap
+import os
+import pickle
 
+
+# Dijkstra's search - only the start is queued at first and vertices are
+# queued as they are reached. The queue is indexed (IndexedMinPQ, or any
+# heap from heaps.HEAPS) so relaxing an edge to an already queued vertex
+# lowers its priority in place (decrease key) - the heap never holds more
+# than one entry per vertex.
+# Finished vertices are kept in a visited set (O(1) check) so they are
+# never queued again. Search can stop early once all targets have been
+# dequeued as their distances are then final.
+# Given a heuristic (estimate of distance left to a single target) this is
+# A* search - queue priority becomes distance + estimate. An estimate that
+# never overestimates can still finish a vertex before its shortest path is
+# found (if it is not consistent, h(u) <= w(u, v) + h(v)), so with a
+# heuristic a finished vertex is reopened when a shorter path reaches it -
+# the path to the target is then shortest for any admissible estimate.
+# Time: O((v + e) log(v)), Space: O(v + e) worst case for the queue.
+def dijkstra_search(neighbors, start, targets=None, heuristic=None,
+                    stats=None, heap="binary"):
+    """
+    Dijkstra's shortest path search from a start vertex.
+    :param neighbors: Function returning (neighbour, weight) pairs of a vertex
+    :param start: The vertex to search from
+    :param targets: Vertices to find - stop once all reached (None = all)
+    :param heuristic: Optional function estimating distance left from vertex
+    :param stats: Optional search_stats.SearchStats to record the search in
+    :param heap: Queue to use - name from heaps.HEAPS e.g. "fibonacci"
+    :return: Tuple of dicts (distances, previous vertex on shortest path)
+    """
+    if stats is not None:
+        stats.start()
+    distances = {start: 0}
+    previous = {start: None}
+    visited = set()
+    remaining = None if targets is None else set(targets)
+
+    pq = make_heap(heap, stats)
+    pq.enqueue(start, 0)
+
+    while len(pq):
+        node = pq.dequeue().value
+        visited.add(node)
+        if remaining is not None:
+            remaining.discard(node)
+            if not remaining:
+                break
+
+        distance = distances[node]
+        edges = neighbors(node)
+        if stats is not None:
+            edges = list(edges)
+            stats.expanded += 1
+            stats.relaxed += len(edges)
+        for neighbor, weight in edges:
+            candidate = distance + weight
+            if candidate < distances.get(neighbor, math.inf):
+                if neighbor in visited:
+                    if heuristic is None:
+                        continue
+                    visited.discard(neighbor)
+                distances[neighbor] = candidate
+                previous[neighbor] = node
+                pq.enqueue(neighbor, candidate if heuristic is None else
+                           candidate + heuristic(neighbor))
+
+    if stats is not None:
+        stats.stop()
+    return distances, previous
+
+
+# rebuild a path by walking back through previous vertices from the end
+def build_path(previous, end):
+    """
+    Path from the start of a search to the end vertex.
+    :param previous: Dict of vertex => previous vertex from a search
+    :param end: The vertex the path should finish at
+    :return: List (empty if end was not reached)
+    """
+    if end not in previous:
+        return []
+
+    path = []
+    while end is not None:
+        path.append(end)
+        end = previous[end]
+
+    return path[::-1]
+
+
+# Bidirectional Dijkstra - runs a search forward from the start and one
+# backward from the end (along reversed edges), always growing the side with
+# the smaller queue. Tracks the best start => end distance seen through any
+# vertex reached by both. Stops once the two smallest queued distances add
+# up to at least that best - no shorter path can be left. Explores roughly
+# two small circles rather than one big one around the start.
+def bidirectional_dijkstra_search(forward, backward, start, end,
+                                  stats=None, heap="binary"):
+    """
+    Shortest path between two vertices searching from both ends.
+    :param forward: Function returning (neighbour, weight) pairs of a vertex
+    :param backward: Same but for edges into a vertex (= forward if undirected)
+    :param start: The vertex to search from
+    :param end: The vertex to search to
+    :param stats: Optional search_stats.SearchStats to record the search in
+    (peak frontier is the larger of the two queues)
+    :param heap: Queues to use - name from heaps.HEAPS e.g. "fibonacci"
+    :return: Tuple (distance, path) - (inf, []) if end cannot be reached
+    """
+    if start == end:
+        return 0, [start]
+
+    if stats is not None:
+        stats.start()
+    neighbors = (forward, backward)
+    distances = ({start: 0}, {end: 0})
+    previous = ({start: None}, {end: None})
+    visited = (set(), set())
+    queues = (make_heap(heap, stats), make_heap(heap, stats))
+    queues[0].enqueue(start, 0)
+    queues[1].enqueue(end, 0)
+    best, meet = math.inf, None
+
+    while len(queues[0]) and len(queues[1]):
+        if queues[0].peek().priority + queues[1].peek().priority >= best:
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        node = queues[side].dequeue().value
+        visited[side].add(node)
+
+        reached, other = distances[side], distances[1 - side]
+        distance = reached[node]
+        edges = neighbors[side](node)
+        if stats is not None:
+            edges = list(edges)
+            stats.expanded += 1
+            stats.relaxed += len(edges)
+        for neighbor, weight in edges:
+            candidate = distance + weight
+            if candidate < reached.get(neighbor, math.inf) and \
+                    neighbor not in visited[side]:
+                reached[neighbor] = candidate
+                previous[side][neighbor] = node
+                queues[side].enqueue(neighbor, candidate)
+            if neighbor in other and \
+                    reached[neighbor] + other[neighbor] < best:
+                best = reached[neighbor] + other[neighbor]
+                meet = neighbor
+
+    if stats is not None:
+        stats.stop()
+    if meet is None:
+        return math.inf, []
+
+    return best, build_path(previous[0], meet) + build_path(
+        previous[1], meet)[::-1][1:]
+
+
+# Yen's algorithm - k shortest simple (loopless) paths, shortest first.
+# Each new path is found by taking every vertex (the spur) of the last path
+# found, keeping the path up to it (the root) and running Dijkstra from the
+# spur with the root's vertices removed and the next edge of every found
+# path sharing that root removed. The cheapest of these candidates is the
+# next path. Time: O(k v (e + v) log(v)) - predictable unlike listing every
+# path which grows exponentially.
+def k_shortest_paths(neighbors, start, end, k):
+    """
+    The k shortest simple paths between two vertices using Yen's algorithm.
+    :param neighbors: Function returning (neighbour, weight) pairs of a vertex
+    :param start: The vertex to search from
+    :param end: The vertex to search to
+    :param k: Most paths to return
+    :return: List of (distance, path) tuples, shortest first
+    """
+    if k <= 0:
+        return []
+    distances, previous = dijkstra_search(neighbors, start, [end])
+    if end not in distances:
+        return []
+
+    found = [(distances[end], build_path(previous, end))]
+    candidates = MinPQ()
+    seen = {tuple(found[0][1])}
+
+    while len(found) < k:
+        path = found[-1][1]
+        root_cost = 0
+        for i in range(len(path) - 1):
+            spur, root = path[i], path[:i + 1]
+            blocked = set(root[:-1])
+            removed = {p[i + 1] for _, p in found if p[:i + 1] == root}
+
+            def spur_neighbors(vertex):
+                return ((v, weight) for v, weight in neighbors(vertex) if
+                        v not in blocked and not (vertex == spur and
+                                                  v in removed))
+
+            distances, previous = dijkstra_search(spur_neighbors, spur, [end])
+            if end in distances:
+                candidate = tuple(root[:-1] + build_path(previous, end))
+                if candidate not in seen:
+                    seen.add(candidate)
+                    candidates.enqueue(candidate, root_cost + distances[end])
+            root_cost += min(weight for v, weight in neighbors(spur) if
+                             v == path[i + 1])
+
+        if not len(candidates):
+            break
+        node = candidates.dequeue()
+        found.append((node.priority, list(node.value)))
+
+    return found
+
+
+# Dynamic shortest paths - keeps a single source shortest path tree up to
+# date as edges are added, removed or re-weighted (Ramalingam-Reps) rather
+# than rerunning Dijkstra after every change. The graph is changed first and
+# then each changed directed edge u => v is passed to update:
+# - cheaper (added / weight lowered): if it improves v, Dijkstra is run from
+#   v only - it stops wherever distances no longer improve.
+# - dearer (removed / weight raised): only matters if it is v's tree edge.
+#   Every vertex under v in the tree (found via children, no search) loses
+#   its distance, takes the best distance offered by an edge from outside
+#   that subtree and Dijkstra settles the subtree from there.
+# Work is proportional to the vertices whose distance changes (and their
+# edges) not the whole graph. Lookups are O(1) between changes.
+# Weights must be non-negative.
+class DynamicShortestPaths:
+    """
+    Dynamic single source shortest paths. Distances and paths from a source
+    repaired incrementally after each edge change.
+    """
+    def __init__(self, neighbors, source, predecessors=None):
+        """
+        :param neighbors: Function returning (neighbour, weight) pairs of a
+        vertex
+        :param source: The vertex distances are measured from
+        :param predecessors: Same but for edges into a vertex (= neighbors
+        if undirected)
+        """
+        self.neighbors = neighbors
+        self.predecessors = predecessors or neighbors
+        self.source = source
+        self.distances, self.previous = dijkstra_search(neighbors, source)
+        # vertex => set of vertices whose shortest path runs through it
+        self.children = {}
+        for vertex, parent in self.previous.items():
+            if parent is not None:
+                self.children.setdefault(parent, set()).add(vertex)
+
+    def __repr__(self):
+        return f"DynamicShortestPaths({self.source!r}, " \
+               f"{len(self.distances)} reached)"
+
+    def __len__(self):
+        return len(self.distances)
+
+    def __contains__(self, vertex):
+        return vertex in self.distances
+
+    # shortest distance from the source - inf if unreachable - O(1)
+    def distance(self, vertex):
+        return self.distances.get(vertex, math.inf)
+
+    # shortest path from the source - empty list if unreachable
+    def path(self, vertex):
+        return build_path(self.previous, vertex)
+
+    # repair after the directed edge u => v changed weight from old to new
+    # (old = inf if the edge was added, new = inf if it was removed). The
+    # graph must already hold the new edge. Undirected graphs call this for
+    # both directions
+    def update(self, u, v, old, new):
+        if new < old:
+            candidate = self.distance(u) + new
+            if candidate < self.distance(v):
+                pq = MinPQ()
+                self._relax(pq, u, v, candidate)
+                self._settle(pq)
+        elif new > old and self.previous.get(v) == u:
+            self._rebuild(v)
+
+    # repair after a vertex (and all its edges) was removed from the graph
+    def remove_vertex(self, vertex):
+        if vertex == self.source:
+            self.distances, self.previous, self.children = {}, {}, {}
+        elif vertex in self.distances:
+            self._rebuild(vertex, removed=vertex)
+
+    # forget the subtree under root then settle it again from the best
+    # distances offered by edges coming in from the rest of the tree
+    def _rebuild(self, root, removed=None):
+        affected, stack = [], [root]
+        while stack:
+            vertex = stack.pop()
+            affected.append(vertex)
+            stack.extend(self.children.pop(vertex, ()))
+        self._unlink(root)
+        for vertex in affected:
+            del self.distances[vertex], self.previous[vertex]
+
+        pq = MinPQ()
+        for vertex in affected:
+            if vertex == removed:
+                continue
+            for parent, weight in self.predecessors(vertex):
+                if parent in self.distances:
+                    self._relax(pq, parent, vertex,
+                                self.distances[parent] + weight)
+        self._settle(pq)
+
+    # record a shorter distance to vertex via parent and queue it
+    def _relax(self, pq, parent, vertex, distance):
+        if distance < self.distances.get(vertex, math.inf):
+            if vertex in self.previous:
+                self._unlink(vertex)
+            self.distances[vertex] = distance
+            self.previous[vertex] = parent
+            self.children.setdefault(parent, set()).add(vertex)
+            pq.enqueue(vertex, distance)
+
+    # detach vertex from its parent's children
+    def _unlink(self, vertex):
+        parent = self.previous.get(vertex)
+        if parent is not None:
+            children = self.children.get(parent)
+            if children is not None:
+                children.discard(vertex)
+                if not children:
+                    del self.children[parent]
+
+    # Dijkstra from the queued vertices - entries made stale by a later
+    # shorter distance are skipped
+    def _settle(self, pq):
+        while len(pq):
+            node = pq.dequeue()
+            vertex, distance = node.value, node.priority
+            if distance > self.distances.get(vertex, math.inf):
+                continue
+            for neighbor, weight in self.neighbors(vertex):
+                self._relax(pq, vertex, neighbor, distance + weight)
+
+
+# Contraction Hierarchies (CH) - precomputed shortcut index for answering
+# lots of shortest path queries on a graph which rarely changes.
+# Preprocessing: vertices are "contracted" (removed) one at a time, least
+# important first. Removing v would break any shortest path u - v - w, so a
+# shortcut edge u - w (weight u-v + v-w) is added unless a "witness" path
+# no longer than it exists without v. Importance is the edge difference
+# (shortcuts added - edges removed) + number of neighbours already
+# contracted (keeps contraction spread evenly), updated lazily.
+# Query: every shortest path goes up the order then down again, so a
+# bidirectional Dijkstra which only follows edges to higher ranked vertices
+# from both ends finds it while settling a tiny part of the graph.
+# Shortcuts remember the vertex they skip so the full path can be unpacked.
+# Undirected graphs only (e.g. ALUWGraph), weights must be non-negative.
+class ContractionHierarchy:
+    """
+    Contraction Hierarchy. Shortcut index over an undirected weighted graph
+    for fast point to point shortest path queries.
+    :return: Number of vertices and shortcuts in the index
+    """
+    def __init__(self, rank, upward, middle):
+        # vertex => contraction order (higher = more important)
+        self.rank = rank
+        # vertex => list of (higher ranked neighbour, weight) incl. shortcuts
+        self.upward = upward
+        # (vertex1, vertex2) => vertex skipped by the shortcut between them
+        self.middle = middle
+
+    def __repr__(self):
+        return f"{ContractionHierarchy.__name__}({len(self.rank)} vertices, " \
+               f"{len(self.middle) // 2} shortcuts)"
+
+    def __len__(self):
+        return len(self.rank)
+
+    # build the index - neighbors gives (neighbour, weight) pairs of a vertex.
+    # settle_limit caps each witness search - a missed witness just adds an
+    # unneeded shortcut so results stay correct
+    @classmethod
+    def build(cls, neighbors, vertices, settle_limit=500):
+        """
+        Preprocess a graph into a contraction hierarchy.
+        :param neighbors: Function returning (neighbour, weight) pairs
+        :param vertices: Iterable of every vertex in the graph
+        :param settle_limit: Most vertices settled by one witness search
+        :return: ContractionHierarchy
+        """
+        # working copy of the remaining graph, keeping the lightest of any
+        # parallel edges
+        remaining = {}
+        for v in vertices:
+            edges = remaining.setdefault(v, {})
+            for w, weight in neighbors(v):
+                if w != v and weight < edges.get(w, math.inf):
+                    edges[w] = weight
+                    remaining.setdefault(w, {})[v] = weight
+
+        contracted_neighbors = dict.fromkeys(remaining, 0)
+        rank, upward, middle = {}, {}, {}
+
+        def importance(v, shortcuts):
+            return len(shortcuts) - len(remaining[v]) + \
+                contracted_neighbors[v]
+
+        pq = IndexedMinPQ()
+        for v in remaining:
+            pq.enqueue(v, importance(v, _ch_shortcuts(remaining, v,
+                                                      settle_limit)))
+
+        while len(pq):
+            v = pq.dequeue().value
+            shortcuts = _ch_shortcuts(remaining, v, settle_limit)
+            # lazy update - importance may have grown since it was queued
+            priority = importance(v, shortcuts)
+            if len(pq) and priority > pq.priorities[0]:
+                pq.enqueue(v, priority)
+                continue
+
+            rank[v] = len(rank)
+            upward[v] = list(remaining[v].items())
+            for u, w, weight in shortcuts:
+                if weight < remaining[u].get(w, math.inf):
+                    remaining[u][w] = remaining[w][u] = weight
+                    middle[(u, w)] = middle[(w, u)] = v
+            for u in remaining[v]:
+                del remaining[u][v]
+                contracted_neighbors[u] += 1
+            del remaining[v]
+
+        return cls(rank, upward, middle)
+
+    # shortest distance and path between two vertices - (inf, []) if no path
+    def shortest_path(self, start, end):
+        """
+        Query the index for the shortest path between two vertices.
+        :param start: The vertex to search from
+        :param end: The vertex to search to
+        :return: Tuple (distance, path)
+        """
+        if start not in self.rank or end not in self.rank:
+            return math.inf, []
+        if start == end:
+            return 0, [start]
+
+        distances = ({start: 0}, {end: 0})
+        previous = ({start: None}, {end: None})
+        settled = (set(), set())
+        queues = (MinPQ(), MinPQ())
+        queues[0].enqueue(start, 0)
+        queues[1].enqueue(end, 0)
+        best, meet = math.inf, None
+
+        while len(queues[0]) or len(queues[1]):
+            if not len(queues[1]) or len(queues[0]) and \
+                    queues[0].values[0].priority <= \
+                    queues[1].values[0].priority:
+                side = 0
+            else:
+                side = 1
+            # nothing left on this side can beat the best found
+            if queues[side].values[0].priority >= best:
+                queues[side].values.clear()
+                continue
+            node = queues[side].dequeue().value
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+
+            reached, other = distances[side], distances[1 - side]
+            if node in other and reached[node] + other[node] < best:
+                best = reached[node] + other[node]
+                meet = node
+            for neighbor, weight in self.upward[node]:
+                candidate = reached[node] + weight
+                if candidate < reached.get(neighbor, math.inf):
+                    reached[neighbor] = candidate
+                    previous[side][neighbor] = node
+                    queues[side].enqueue(neighbor, candidate)
+
+        if meet is None:
+            return math.inf, []
+
+        # path through the index then swap each shortcut for what it skips
+        path = build_path(previous[0], meet) + build_path(
+            previous[1], meet)[::-1][1:]
+        full_path = [start]
+        for u, w in zip(path, path[1:]):
+            full_path.extend(self._unpack(u, w))
+
+        return best, full_path
+
+    # shortest distance only
+    def distance(self, start, end):
+        return self.shortest_path(start, end)[0]
+
+    # vertices after u up to w with every shortcut replaced by real edges
+    def _unpack(self, u, w):
+        vertices = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            m = self.middle.get((a, b))
+            if m is None:
+                vertices.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+
+        return vertices
+
+    # save the index to disk so it only has to be built once. Uses pickle -
+    # only load files you created
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump({"version": 1, "rank": self.rank,
+                         "upward": self.upward, "middle": self.middle}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    # load an index saved with save
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+
+        return cls(data["rank"], data["upward"], data["middle"])
+
+
+# shortcuts needed to contract v - one local Dijkstra (witness search) per
+# neighbour u, ignoring v, looking for paths to its other neighbours no
+# longer than going through v. Returns list of (u, w, weight)
+def _ch_shortcuts(remaining, v, settle_limit):
+    edges = list(remaining[v].items())
+    shortcuts = []
+
+    for i, (u, to_u) in enumerate(edges[:-1]):
+        targets = edges[i + 1:]
+        limit = to_u + max(weight for _, weight in targets)
+        distances = {u: 0}
+        settled = set()
+        pq = MinPQ()
+        pq.enqueue(u, 0)
+        while len(pq) and len(settled) < settle_limit:
+            node = pq.dequeue()
+            if node.value in settled:
+                continue
+            if node.priority > limit:
+                break
+            settled.add(node.value)
+            for neighbor, weight in remaining[node.value].items():
+                candidate = node.priority + weight
+                if neighbor != v and candidate < distances.get(neighbor,
+                                                               math.inf):
+                    distances[neighbor] = candidate
+                    pq.enqueue(neighbor, candidate)
+
+        for w, to_w in targets:
+            if distances.get(w, math.inf) > to_u + to_w:
+                shortcuts.append((u, w, to_u + to_w))
+
+    return shortcuts
+
+
+# All Pairs Shortest Paths - shortest distance between every pair of
+# vertices, stored in a DistanceMatrix (one flat array of n*n floats, 8
+# bytes each, rather than nested dicts). Big results can be written to a
+# memory mapped file instead so they do not have to fit in memory.
+class DistanceMatrix:
+    """
+    Distance matrix. matrix[source, vertex] returns the shortest distance
+    (inf if there is no path). Rows are the sources (every vertex for all
+    pairs results) and columns every vertex.
+    :return: Number of sources and vertices in the matrix
+    """
+    def __init__(self, vertices, data, file=None, sources=None):
+        self.vertices = list(vertices)
+        self.ids = {v: i for i, v in enumerate(self.vertices)}
+        self.sources = self.vertices if sources is None else list(sources)
+        self.source_ids = self.ids if sources is None else \
+            {v: i for i, v in enumerate(self.sources)}
+        # flat row major array('d') or memoryview of a memory mapped file
+        self.data = data
+        self.file = file
+
+    def __repr__(self):
+        return f"{DistanceMatrix.__name__}({len(self.sources)} sources, " \
+               f"{len(self.vertices)} vertices)"
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, pair):
+        n = len(self.vertices)
+        return self.data[self.source_ids[pair[0]] * n + self.ids[pair[1]]]
+
+    # return distances from a source to every vertex (in vertices order)
+    def row(self, source):
+        n = len(self.vertices)
+        i = self.source_ids[source]
+        return self.data[i * n:(i + 1) * n]
+
+    # create an empty (all inf) matrix - in memory or a file if path given
+    @classmethod
+    def empty(cls, vertices, path=None, sources=None):
+        vertices = list(vertices)
+        rows = len(vertices) if sources is None else len(sources)
+        if path is None:
+            return cls(vertices, array("d", [math.inf]) * (rows * len(
+                vertices)), sources=sources)
+
+        with open(path, "wb") as f:
+            row = array("d", [math.inf]) * len(vertices)
+            for _ in range(rows):
+                row.tofile(f)
+        return cls.open(path, vertices, sources)
+
+    # reopen a matrix file written earlier - vertices (and sources) must be
+    # in the same order
+    @classmethod
+    def open(cls, path, vertices, sources=None):
+        with open(path, "r+b") as f:
+            # empty files cannot be memory mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(vertices, array("d"), sources=sources)
+            mapped = mmap.mmap(f.fileno(), 0)
+
+        return cls(vertices, memoryview(mapped).cast("d"), mapped, sources)
+
+    # write changes to disk and release a memory mapped file
+    def close(self):
+        if self.file is not None:
+            self.data.release()
+            self.file.flush()
+            self.file.close()
+            self.file = None
+
+
+# Floyd-Warshall - for every vertex k check if going through k is shorter
+# for every pair i, j: d[i][j] = min(d[i][j], d[i][k] + d[k][j]).
+# Time: O(v^3), Space: O(v^2) - best for small or dense graphs. Rows are
+# relaxed straight in the result matrix so with path only a couple of rows
+# are held in memory at once. Each row is one list comprehension (still a
+# Python step per pair) and rows that cannot reach k are skipped - roughly
+# 1.5-3x faster than a plain triple loop, depending on how sparse it is.
+# Works with negative edges but not negative cycles.
+def floyd_warshall(neighbors, vertices, path=None):
+    """
+    All pairs shortest distances using Floyd-Warshall.
+    :param neighbors: Function returning (neighbour, weight) pairs of a vertex
+    :param vertices: Iterable of every vertex in the graph
+    :param path: Optional file to memory map the result to
+    :return: DistanceMatrix
+    """
+    vertices = list(vertices)
+    ids = {v: i for i, v in enumerate(vertices)}
+    n = len(vertices)
+    matrix = DistanceMatrix.empty(vertices, path)
+    data = matrix.data
+    for i, v in enumerate(vertices):
+        start = i * n
+        data[start + i] = 0
+        for w, weight in neighbors(v):
+            if weight < data[start + ids[w]]:
+                data[start + ids[w]] = weight
+
+    for k in range(n):
+        # row k does not change while going through k (d[k][k] = 0)
+        row_k = data[k * n:(k + 1) * n].tolist()
+        for i in range(n):
+            d = data[i * n + k]
+            if d == math.inf or i == k:
+                continue
+            start = i * n
+            data[start:start + n] = array("d", [
+                x if x <= d + y else d + y
+                for x, y in zip(data[start:start + n].tolist(), row_k)])
+
+    return matrix
+
+
+# Johnson's algorithm - Dijkstra from every vertex, O(v e log(v)) so much
+# better than Floyd-Warshall on big sparse graphs. Negative edges are
+# handled by Bellman-Ford first finding a potential h for each vertex and
+# reweighting edges to w + h[u] - h[v] (never negative, same shortest
+# paths). The per source searches are independent so they are spread over
+# a pool of worker processes. Each worker gets the graph once as flat CSR
+# arrays (see graphs.CSRGraph) and sends back one row of distances.
+def johnson(neighbors, vertices, workers=None, path=None):
+    """
+    All pairs shortest distances using Johnson's algorithm.
+    :param neighbors: Function returning (neighbour, weight) pairs of a vertex
+    :param vertices: Iterable of every vertex in the graph
+    :param workers: Number of processes (None = cpu count, 1 = no pool)
+    :param path: Optional file to memory map the result to
+    :return: DistanceMatrix
+    """
+    vertices = list(vertices)
+    ids = {v: i for i, v in enumerate(vertices)}
+    n = len(vertices)
+    edges = [[(ids[w], weight) for w, weight in neighbors(v)]
+             for v in vertices]
+
+    # Bellman-Ford from an imaginary vertex with a 0 edge to every vertex
+    h = [0] * n
+    for _ in range(n + 1):
+        changed = False
+        for u in range(n):
+            for w, weight in edges[u]:
+                if h[u] + weight < h[w]:
+                    h[w] = h[u] + weight
+                    changed = True
+        if not changed:
+            break
+    else:
+        raise ValueError("Graph contains a negative weight cycle.")
+
+    offsets, targets, weights = array("q", [0]), array("q"), array("d")
+    for u in range(n):
+        for w, weight in edges[u]:
+            targets.append(w)
+            weights.append(weight + h[u] - h[w])
+        offsets.append(len(targets))
+
+    matrix = DistanceMatrix.empty(vertices, path)
+    if workers == 1 or n < 2:
+        rows = (csr_distances(offsets, targets, weights, s) for s in range(n))
+        _johnson_fill(matrix, rows, h)
+    else:
+        with ProcessPoolExecutor(workers, initializer=_johnson_init,
+                                 initargs=(offsets, targets, weights)) as pool:
+            rows = pool.map(_johnson_row, range(n), chunksize=max(
+                1, n // (4 * (workers or os.cpu_count() or 1))))
+            _johnson_fill(matrix, rows, h)
+
+    return matrix
+
+
+# undo the reweighting of each row and copy it into the matrix
+def _johnson_fill(matrix, rows, h):
+    n = len(h)
+    for u, row in enumerate(rows):
+        matrix.data[u * n:(u + 1) * n] = array("d", [
+            d - h[u] + h[w] for w, d in enumerate(row)])
+
+
+# worker process state - graph arrays sent once when the worker starts
+_johnson_graph = None
+
+
+def _johnson_init(offsets, targets, weights):
+    global _johnson_graph
+    _johnson_graph = (offsets, targets, weights)
+
+
+def _johnson_row(source):
+    return csr_distances(*_johnson_graph, source)
+
+
+# Dijkstra from one source over CSR arrays (integer vertex ids) - distance
+# to every vertex as an array('d'), inf if not reachable. Unweighted graphs
+# use a plain BFS (distance = number of edges) as no queue is needed
+def csr_distances(offsets, targets, weights, source):
+    """
+    Single source shortest distances over CSR graph arrays.
+    :param offsets: Array - edges of vertex i are offsets[i]:offsets[i+1]
+    :param targets: Array of the vertex id at the end of each edge
+    :param weights: Array of edge weights (None = every edge is 1)
+    :param source: Vertex id to search from
+    :return: array('d')
+    """
+    if weights is None:
+        return csr_hops(offsets, targets, source)
+
+    n = len(offsets) - 1
+    distances = array("d", [math.inf]) * n
+    distances[source] = 0
+    # indexed so each vertex is queued once and lowered in place
+    pq = IndexedMinPQ()
+    pq.enqueue(source, 0)
+
+    while len(pq):
+        node = pq.dequeue().value
+        distance = distances[node]
+        for j in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[j]
+            candidate = distance + (1 if weights is None else weights[j])
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                pq.enqueue(neighbor, candidate)
+
+    return distances
+
+
+# BFS from one source over CSR arrays - number of edges to every vertex.
+# The distances array doubles as the visited check. Time: O(v + e)
+def csr_hops(offsets, targets, source):
+    """
+    Single source edge counts over CSR graph arrays.
+    :param offsets: Array - edges of vertex i are offsets[i]:offsets[i+1]
+    :param targets: Array of the vertex id at the end of each edge
+    :param source: Vertex id to search from
+    :return: array('d')
+    """
+    distances = array("d", [math.inf]) * (len(offsets) - 1)
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for node in frontier:
+            for j in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[j]
+                if distances[neighbor] == math.inf:
+                    distances[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    return distances
+
+
+# A* heuristics - estimate the distance between two vertex coordinates.
+# Euclidean - straight line distance between (x, y, ...) points. Never
+# overestimates when edges are straight lines between vertices
+def euclidean(a, b):
+    """
+    Straight line distance between two points.
+    :param a: Tuple of coordinates
+    :param b: Tuple of coordinates
+    :return: Float
+    """
+    return math.dist(a, b)
+
+
+# Manhattan - sum of distance along each axis. Best for grids where moves
+# are only along the axes
+def manhattan(a, b):
+    """
+    Grid (taxicab) distance between two points.
+    :param a: Tuple of coordinates
+    :param b: Tuple of coordinates
+    :return: Float
+    """
+    return sum(abs(i - j) for i, j in zip(a, b))
+
+
+# Haversine - great circle distance in km between (latitude, longitude)
+# points given in degrees. For road/ geo graphs with weights in km
+def haversine(a, b):
+    """
+    Great circle distance between two (lat, lon) points in kilometres.
+    :param a: Tuple of (latitude, longitude) in degrees
+    :param b: Tuple of (latitude, longitude) in degrees
+    :return: Float
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(
+        lat2) * math.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * 6371.0088 * math.asin(math.sqrt(h))
+
+
+HEURISTICS = {"euclidean": euclidean, "manhattan": manhattan,
+              "haversine": haversine}
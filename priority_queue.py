@@ -4,15 +4,30 @@
 # or 2n+2 (right). Child => parent = (n-1)//2 where n is current index
 # Node data for priority queues can contain any data as sorted by priority
 # not value
+from array import array
+
+
 class Node:
+    # fixed attributes - smaller and quicker to create and read, which adds
+    # up over the millions of nodes a big queue makes
+    __slots__ = ("value", "priority")
+
     def __init__(self, value, priority):
         self.value = value
         self.priority = priority
 
 
+# make a list of nodes from (value, priority) pairs. For very big builds
+# most of the time is the garbage collector rescanning the new nodes -
+# callers can pause it (gc.disable/ gc.enable) around the build if they
+# own the process, it is left alone here
+def _nodes(pairs):
+    return [Node(value, priority) for value, priority in pairs]
+
+
 # Big O for priority queues is Time: O(log(n)) for insertion and removal.
 # Search is O(n). Space: O(n)
-# Min Priority Queue - parents always less than child nodes
+# Max Priority Queue - parents always greater than child nodes
 class MaxPQ:
     """
     Max Priority Queue. Stores node data sorted by priority level. Highest
@@ -25,62 +40,114 @@ class MaxPQ:
     def __repr__(self):
         return f"{self.get_all_nodes()}"
 
+    def __len__(self):
+        return len(self.values)
+
     # returns a list of all nodes as tuples (data, priority)
     def get_all_nodes(self):
         return [(x.value, x.priority) for x in self.values]
 
-    # enqueue a new node
-    def enqueue(self, value, priority):
-        new_node = Node(value, priority)
-        self.values.append(new_node)
-        index = len(self.values) - 1
-        parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
-
-        while parent_index is not None:
-            if priority > self.values[parent_index].priority:
-                self.values[index] = self.values[parent_index]
-                self.values[parent_index] = new_node
+    # build a queue from (value, priority) pairs in one go - Floyd's bottom
+    # up heapify sifts each parent down starting from the last one. O(n)
+    # rather than O(n log(n)) for enqueueing them one at a time
+    @classmethod
+    def from_pairs(cls, pairs):
+        pq = cls()
+        pq.values = _nodes(pairs)
+        pq._heapify()
+        return pq
+
+    # restore the heap order of every node - O(n)
+    def _heapify(self):
+        for index in range(len(self.values) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    # move node at index up until its parent has higher priority
+    def _sift_up(self, index):
+        values = self.values
+        node = values[index]
+        priority = node.priority
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priority > values[parent_index].priority:
+                values[index] = values[parent_index]
                 index = parent_index
-                parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
             else:
                 break
+        values[index] = node
+
+    # move node at index down until both children have lower priority -
+    # children move up into the gap and the node is written once at the end
+    def _sift_down(self, index):
+        values = self.values
+        length = len(values)
+        node = values[index]
+        priority = node.priority
+        while True:
+            child = 2 * index + 1
+            if child >= length:
+                break
+            if child + 1 < length and \
+                    values[child + 1].priority > values[child].priority:
+                child += 1
+            if values[child].priority > priority:
+                values[index] = values[child]
+                index = child
+            else:
+                break
+        values[index] = node
+
+    # enqueue a new node
+    def enqueue(self, value, priority):
+        self.values.append(Node(value, priority))
+        self._sift_up(len(self.values) - 1)
 
         return self.values
 
     # enqueue multiple nodes
     def enqueue_all(self, lst):
-        for node in lst:
-            self.enqueue(node[0], node[1])
+        self.push_many(lst)
+
+    # enqueue many (value, priority) pairs at once - if there are at least
+    # as many new nodes as old ones the whole heap is rebuilt (O(n)),
+    # otherwise each new node is sifted up (O(k log(n)))
+    def push_many(self, pairs):
+        values = self.values
+        start = len(values)
+        values.extend(_nodes(pairs))
+        if len(values) - start >= start:
+            self._heapify()
+        else:
+            for index in range(start, len(values)):
+                self._sift_up(index)
+
+        return self.values
+
+    # dequeue the k highest priority nodes - returned in order
+    def pop_many(self, k):
+        values = self.values
+        removed = []
+        for _ in range(min(k, len(values))):
+            last = values.pop()
+            if values:
+                removed.append(values[0])
+                values[0] = last
+                self._sift_down(0)
+            else:
+                removed.append(last)
+
+        return removed
 
     # return dequeued node at stated index, default is to remove the root
     def dequeue(self, start=0):
         if len(self.values) < 0 or start >= len(self.values):
             return None
-        elif len(self.values) == 1 or start == len(self.values)-1:
+        if len(self.values) == 1 or start == len(self.values)-1:
             return self.values.pop()
 
         node_removed = self.values[start]
-        end_node = self.values.pop()
-        self.values[start] = end_node
-
-        index = start
-
-        while True:
-            left = 2 * index + 1 if 2 * index + 1 < len(self.values) else None
-            right = 2 * index + 2 if 2 * index + 2 < len(self.values) else None
-            if left and end_node.priority < self.values[left].priority or \
-                    right and end_node.priority > self.values[right].priority:
-                if not right or self.values[left].priority >= self.values[
-                        right].priority:
-                    self.values[index] = self.values[left]
-                    self.values[left] = end_node
-                    index = left
-                else:
-                    self.values[index] = self.values[right]
-                    self.values[right] = end_node
-                    index = right
-            else:
-                break
+        self.values[start] = self.values.pop()
+        self._sift_down(start)
 
         return node_removed
 
@@ -92,8 +159,10 @@ class MinPQ:
     priority values first.
     :return: List of nodes contained in the queue
     """
-    def __init__(self):
+    def __init__(self, stats=None):
         self.values = []
+        # optional search_stats.SearchStats counting pushes/ pops
+        self.stats = stats
 
     def __repr__(self):
         return f"{self.get_all_nodes()}"
@@ -105,57 +174,547 @@ class MinPQ:
     def get_all_nodes(self):
         return [(x.value, x.priority) for x in self.values]
 
-    # enqueue a new node
-    def enqueue(self, value, priority):
-        new_node = Node(value, priority)
-        self.values.append(new_node)
-        index = len(self.values) - 1
-        parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
-
-        while parent_index is not None:
-            if priority < self.values[parent_index].priority:
-                self.values[index] = self.values[parent_index]
-                self.values[parent_index] = new_node
+    # build a queue from (value, priority) pairs in one go - Floyd's bottom
+    # up heapify sifts each parent down starting from the last one. O(n)
+    # rather than O(n log(n)) for enqueueing them one at a time
+    @classmethod
+    def from_pairs(cls, pairs):
+        pq = cls()
+        pq.values = _nodes(pairs)
+        pq._heapify()
+        return pq
+
+    # restore the heap order of every node - O(n)
+    def _heapify(self):
+        for index in range(len(self.values) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    # move node at index up until its parent has lower priority
+    def _sift_up(self, index):
+        values = self.values
+        node = values[index]
+        priority = node.priority
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priority < values[parent_index].priority:
+                values[index] = values[parent_index]
                 index = parent_index
-                parent_index = (index-1)//2 if (index-1)//2 >= 0 else None
             else:
                 break
+        values[index] = node
+
+    # move node at index down until both children have higher priority -
+    # children move up into the gap and the node is written once at the end
+    def _sift_down(self, index):
+        values = self.values
+        length = len(values)
+        node = values[index]
+        priority = node.priority
+        while True:
+            child = 2 * index + 1
+            if child >= length:
+                break
+            if child + 1 < length and \
+                    values[child + 1].priority < values[child].priority:
+                child += 1
+            if values[child].priority < priority:
+                values[index] = values[child]
+                index = child
+            else:
+                break
+        values[index] = node
+
+    # enqueue a new node
+    def enqueue(self, value, priority):
+        self.values.append(Node(value, priority))
+        if self.stats is not None:
+            self.stats.pushed(len(self.values))
+        self._sift_up(len(self.values) - 1)
 
         return self.values
 
     # enqueue multiple nodes
     def enqueue_all(self, lst):
-        for node in lst:
-            self.enqueue(node[0], node[1])
+        self.push_many(lst)
+
+    # enqueue many (value, priority) pairs at once - if there are at least
+    # as many new nodes as old ones the whole heap is rebuilt (O(n)),
+    # otherwise each new node is sifted up (O(k log(n)))
+    def push_many(self, pairs):
+        values = self.values
+        start = len(values)
+        values.extend(_nodes(pairs))
+        if self.stats is not None:
+            self.stats.pushes += len(values) - start
+            self.stats.frontier(len(values))
+        if len(values) - start >= start:
+            self._heapify()
+        else:
+            for index in range(start, len(values)):
+                self._sift_up(index)
+
+        return self.values
+
+    # dequeue the k lowest priority nodes - returned in order
+    def pop_many(self, k):
+        values = self.values
+        removed = []
+        for _ in range(min(k, len(values))):
+            last = values.pop()
+            if values:
+                removed.append(values[0])
+                values[0] = last
+                self._sift_down(0)
+            else:
+                removed.append(last)
+        if self.stats is not None:
+            self.stats.pops += len(removed)
+
+        return removed
 
     # return dequeued node at stated index, default is to remove the root
     def dequeue(self, start=0):
         if len(self.values) < 0 or start >= len(self.values):
             return None
-        elif len(self.values) == 1 or start == len(self.values)-1:
+        if self.stats is not None:
+            self.stats.pops += 1
+        if len(self.values) == 1 or start == len(self.values)-1:
             return self.values.pop()
 
         node_removed = self.values[start]
-        end_node = self.values.pop()
-        self.values[start] = end_node
+        self.values[start] = self.values.pop()
+        self._sift_down(start)
+
+        return node_removed
+
+
+# Indexed Min Priority Queue - min priority queue which also keeps a hash
+# table of value => index in the heap, so a value's place can be found in
+# O(1) and its priority changed or the value removed without adding a
+# duplicate or knowing its index. Values must be hashable and each value
+# can only be queued once, so a graph search's heap never holds more than
+# one entry per vertex. Stores values and priorities in two lists rather
+# than a node per item.
+# Big O: enqueue, dequeue, decrease/ increase key and remove O(log(n)),
+# contains and peek O(1)
+class IndexedMinPQ:
+    """
+    Indexed Min Priority Queue. Lowest priority values first and the
+    priority of a queued value can be changed (decrease_key, increase_key,
+    update) or the value removed from anywhere in the queue.
+    :return: List of nodes contained in the queue
+    """
+    def __init__(self, stats=None):
+        self.values = []
+        self.priorities = []
+        self.positions = {}
+        # optional search_stats.SearchStats counting pushes/ pops
+        self.stats = stats
+
+    def __repr__(self):
+        return f"{self.get_all_nodes()}"
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.positions
+
+    # check if a value is queued - O(1)
+    def contains(self, value):
+        return value in self.positions
+
+    # returns a list of all nodes as tuples (data, priority)
+    def get_all_nodes(self):
+        return list(zip(self.values, self.priorities))
+
+    # return the priority of a queued value
+    def get_priority(self, value):
+        return self.priorities[self.positions[value]]
+
+    # return (without removing) the node that dequeue would return
+    def peek(self):
+        if not self.values:
+            return None
+        return Node(self.values[0], self.priorities[0])
+
+    # build a queue from (value, priority) pairs in one go with Floyd's
+    # bottom up heapify - O(n). A repeated value keeps the priority which
+    # would come out first
+    @classmethod
+    def from_pairs(cls, pairs, stats=None):
+        pq = cls(stats=stats)
+        pq.push_many(pairs)
+        return pq
+
+    # enqueue many (value, priority) pairs at once - same rules as enqueue.
+    # If there are at least as many new pairs as queued values the whole
+    # heap is rebuilt (O(n)), otherwise each pair is enqueued (O(k log(n)))
+    def push_many(self, pairs):
+        pairs = list(pairs)
+        positions, values, priorities = self.positions, self.values, \
+            self.priorities
+        if len(pairs) < len(values):
+            for value, priority in pairs:
+                self.enqueue(value, priority)
+            return values
+
+        start = len(values)
+        for value, priority in pairs:
+            if value in positions:
+                index = positions[value]
+                if self._before(priority, priorities[index]):
+                    priorities[index] = priority
+            else:
+                positions[value] = len(values)
+                values.append(value)
+                priorities.append(priority)
+        if self.stats is not None:
+            self.stats.pushes += len(values) - start
+            self.stats.frontier(len(values))
+        for index in range(len(values) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+        return values
+
+    # dequeue the k lowest priority nodes - returned in order
+    def pop_many(self, k):
+        return [self.dequeue() for _ in range(min(k, len(self.values)))]
+
+    # True if priority a should come out before priority b
+    def _before(self, a, b):
+        return a < b
+
+    # swap two heap slots keeping the positions table up to date
+    def _swap(self, i, j):
+        values, priorities = self.values, self.priorities
+        values[i], values[j] = values[j], values[i]
+        priorities[i], priorities[j] = priorities[j], priorities[i]
+        self.positions[values[i]] = i
+        self.positions[values[j]] = j
 
-        index = start
+    # move item at index up until parent is smaller
+    def _sift_up(self, index):
+        priorities = self.priorities
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priorities[index] < priorities[parent_index]:
+                self._swap(index, parent_index)
+                index = parent_index
+            else:
+                break
 
+    # move item at index down until both children are bigger
+    def _sift_down(self, index):
+        priorities = self.priorities
+        length = len(priorities)
         while True:
-            left = 2 * index + 1 if 2 * index + 1 < len(self.values) else None
-            right = 2 * index + 2 if 2 * index + 2 < len(self.values) else None
-            if left and end_node.priority > self.values[left].priority or \
-                    right and end_node.priority > self.values[right].priority:
-                if not right or self.values[left].priority <= self.values[
-                        right].priority:
-                    self.values[index] = self.values[left]
-                    self.values[left] = end_node
-                    index = left
-                else:
-                    self.values[index] = self.values[right]
-                    self.values[right] = end_node
-                    index = right
+            smallest = index
+            left = 2 * index + 1
+            right = left + 1
+            if left < length and priorities[left] < priorities[smallest]:
+                smallest = left
+            if right < length and priorities[right] < priorities[smallest]:
+                smallest = right
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+    # move the item at index up or down after its priority changed
+    def _reposition(self, index):
+        value = self.values[index]
+        self._sift_up(index)
+        self._sift_down(self.positions[value])
+
+    # enqueue a new value - an already queued value has its priority changed
+    # if the new one would come out sooner
+    def enqueue(self, value, priority):
+        if value in self.positions:
+            index = self.positions[value]
+            if self._before(priority, self.priorities[index]):
+                self.priorities[index] = priority
+                self._sift_up(index)
+            return self.values
+
+        self.positions[value] = len(self.values)
+        self.values.append(value)
+        self.priorities.append(priority)
+        if self.stats is not None:
+            self.stats.pushed(len(self.values))
+        self._sift_up(len(self.values) - 1)
+
+        return self.values
+
+    # return (and remove) the node at the top of the heap (lowest priority)
+    def dequeue(self):
+        if not self.values:
+            return None
+        if self.stats is not None:
+            self.stats.pops += 1
+
+        self._swap(0, len(self.values) - 1)
+        value = self.values.pop()
+        priority = self.priorities.pop()
+        del self.positions[value]
+        self._sift_down(0)
+
+        return Node(value, priority)
+
+    # remove a queued value from anywhere in the heap - the last item takes
+    # its place and is moved up or down. Returns the removed node
+    def remove(self, value):
+        index = self.positions[value]
+        last = len(self.values) - 1
+        self._swap(index, last)
+        self.values.pop()
+        priority = self.priorities.pop()
+        del self.positions[value]
+        if index < last:
+            self._reposition(index)
+
+        return Node(value, priority)
+
+    # lower the priority of a queued value
+    def decrease_key(self, value, priority):
+        index = self.positions[value]
+        if priority > self.priorities[index]:
+            raise ValueError(f"New priority {priority} is higher than "
+                             f"current priority {self.priorities[index]}.")
+        self.priorities[index] = priority
+        self._reposition(index)
+
+    # raise the priority of a queued value
+    def increase_key(self, value, priority):
+        index = self.positions[value]
+        if priority < self.priorities[index]:
+            raise ValueError(f"New priority {priority} is lower than "
+                             f"current priority {self.priorities[index]}.")
+        self.priorities[index] = priority
+        self._reposition(index)
+
+    # set the priority of a queued value whichever way it moves
+    def update(self, value, priority):
+        index = self.positions[value]
+        self.priorities[index] = priority
+        self._reposition(index)
+
+
+# Indexed Max Priority Queue - same as IndexedMinPQ but highest priority
+# values first (parents always bigger than children)
+class IndexedMaxPQ(IndexedMinPQ):
+    """
+    Indexed Max Priority Queue. Highest priority values first and the
+    priority of a queued value can be changed or the value removed.
+    :return: List of nodes contained in the queue
+    """
+    # True if priority a should come out before priority b
+    def _before(self, a, b):
+        return a > b
+
+    # move item at index up until parent is bigger
+    def _sift_up(self, index):
+        priorities = self.priorities
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priorities[index] > priorities[parent_index]:
+                self._swap(index, parent_index)
+                index = parent_index
             else:
                 break
 
-        return node_removed
+    # move item at index down until both children are smaller
+    def _sift_down(self, index):
+        priorities = self.priorities
+        length = len(priorities)
+        while True:
+            largest = index
+            left = 2 * index + 1
+            right = left + 1
+            if left < length and priorities[left] > priorities[largest]:
+                largest = left
+            if right < length and priorities[right] > priorities[largest]:
+                largest = right
+            if largest == index:
+                break
+            self._swap(index, largest)
+            index = largest
+
+
+# Compact Min Priority Queue - same as MinPQ but no Node per item.
+# Priorities are floats kept in a typed array (8 bytes each, stored side by
+# side) and values in a parallel list - or a typed array too if a typecode
+# is given e.g. "q" for integer ids such as graph vertex ids. Sifting only
+# reads the priority array so comparisons are between plain floats rather
+# than attribute look ups on scattered objects. Roughly 16 bytes per item
+# with an id array against ~56 for a Node (48 with __slots__ + a list slot).
+# Big O: same as MinPQ
+class CompactMinPQ:
+    """
+    Compact Min Priority Queue. Float priorities in an array with values in
+    a parallel list/ array. Lowest priority values first.
+    :return: List of nodes contained in the queue
+    """
+    def __init__(self, typecode=None, stats=None):
+        self.values = [] if typecode is None else array(typecode)
+        self.priorities = array("d")
+        # optional search_stats.SearchStats counting pushes/ pops
+        self.stats = stats
+
+    def __repr__(self):
+        return f"{self.get_all_nodes()}"
+
+    def __len__(self):
+        return len(self.priorities)
+
+    # returns a list of all nodes as tuples (data, priority)
+    def get_all_nodes(self):
+        return list(zip(self.values, self.priorities))
+
+    # build a queue from (value, priority) pairs in one go with Floyd's
+    # bottom up heapify - O(n)
+    @classmethod
+    def from_pairs(cls, pairs, typecode=None, stats=None):
+        pq = cls(typecode, stats)
+        pq.push_many(pairs)
+        return pq
+
+    # return (without removing) the node that dequeue would return
+    def peek(self):
+        if not self.priorities:
+            return None
+        return Node(self.values[0], self.priorities[0])
+
+    # move item at index up until its parent has lower priority
+    def _sift_up(self, index):
+        values, priorities = self.values, self.priorities
+        value, priority = values[index], priorities[index]
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priority < priorities[parent_index]:
+                values[index] = values[parent_index]
+                priorities[index] = priorities[parent_index]
+                index = parent_index
+            else:
+                break
+        values[index] = value
+        priorities[index] = priority
+
+    # move item at index down until both children have higher priority.
+    # Each priority is read from the array once per level
+    def _sift_down(self, index):
+        values, priorities = self.values, self.priorities
+        length = len(priorities)
+        value, priority = values[index], priorities[index]
+        child = 2 * index + 1
+        while child < length:
+            child_priority = priorities[child]
+            right = child + 1
+            if right < length:
+                right_priority = priorities[right]
+                if right_priority < child_priority:
+                    child, child_priority = right, right_priority
+            if child_priority < priority:
+                values[index] = values[child]
+                priorities[index] = child_priority
+                index = child
+                child = 2 * index + 1
+            else:
+                break
+        values[index] = value
+        priorities[index] = priority
+
+    # enqueue a new item
+    def enqueue(self, value, priority):
+        self.values.append(value)
+        self.priorities.append(priority)
+        if self.stats is not None:
+            self.stats.pushed(len(self.priorities))
+        self._sift_up(len(self.priorities) - 1)
+
+    # enqueue many (value, priority) pairs at once - rebuilds the whole
+    # heap (O(n)) if there are at least as many new items as old ones,
+    # otherwise sifts each new item up (O(k log(n)))
+    def push_many(self, pairs):
+        values, priorities = self.values, self.priorities
+        start = len(priorities)
+        for value, priority in pairs:
+            values.append(value)
+            priorities.append(priority)
+        if self.stats is not None:
+            self.stats.pushes += len(priorities) - start
+            self.stats.frontier(len(priorities))
+        if len(priorities) - start >= start:
+            for index in range(len(priorities) // 2 - 1, -1, -1):
+                self._sift_down(index)
+        else:
+            for index in range(start, len(priorities)):
+                self._sift_up(index)
+
+    # return (and remove) the node at the top of the heap (lowest priority)
+    def dequeue(self):
+        values, priorities = self.values, self.priorities
+        if not priorities:
+            return None
+        if self.stats is not None:
+            self.stats.pops += 1
+
+        value, priority = values[0], priorities[0]
+        last_value, last_priority = values.pop(), priorities.pop()
+        if priorities:
+            values[0], priorities[0] = last_value, last_priority
+            self._sift_down(0)
+
+        return Node(value, priority)
+
+    # dequeue the k lowest priority nodes - returned in order
+    def pop_many(self, k):
+        return [self.dequeue() for _ in range(min(k, len(self.priorities)))]
+
+
+# Compact Max Priority Queue - same as CompactMinPQ but highest priority
+# values first
+class CompactMaxPQ(CompactMinPQ):
+    """
+    Compact Max Priority Queue. Float priorities in an array with values in
+    a parallel list/ array. Highest priority values first.
+    :return: List of nodes contained in the queue
+    """
+    # move item at index up until its parent has higher priority
+    def _sift_up(self, index):
+        values, priorities = self.values, self.priorities
+        value, priority = values[index], priorities[index]
+        while index > 0:
+            parent_index = (index - 1) // 2
+            if priority > priorities[parent_index]:
+                values[index] = values[parent_index]
+                priorities[index] = priorities[parent_index]
+                index = parent_index
+            else:
+                break
+        values[index] = value
+        priorities[index] = priority
+
+    # move item at index down until both children have lower priority.
+    # Each priority is read from the array once per level
+    def _sift_down(self, index):
+        values, priorities = self.values, self.priorities
+        length = len(priorities)
+        value, priority = values[index], priorities[index]
+        child = 2 * index + 1
+        while child < length:
+            child_priority = priorities[child]
+            right = child + 1
+            if right < length:
+                right_priority = priorities[right]
+                if right_priority > child_priority:
+                    child, child_priority = right, right_priority
+            if child_priority > priority:
+                values[index] = values[child]
+                priorities[index] = child_priority
+                index = child
+                child = 2 * index + 1
+            else:
+                break
+        values[index] = value
+        priorities[index] = priority
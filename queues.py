@@ -12,7 +12,8 @@ class Node:
 
 
 # Big O notation:
-# Insertion O(1), Removal O(1)->O(n), Searching O(n), Access(O(n).
+# Insertion O(1), Removal O(1)->O(n), Searching O(n) (O(1) for "in" checks
+# as values are indexed), Access(O(n).
 class Queue:
     """
     First in, last out (FIFO) system. Create a non indexed node based list
@@ -23,13 +24,18 @@ class Queue:
         self.first = None
         self.last = None
         self.size = 0
+        # count of each value held - makes 'in' checks O(1)
+        self.index = {}
 
     def __repr__(self):
         return f"{self.all_values()}"
 
-    # return generated expression of values
+    # walk the nodes once returning each value - O(n) for a full pass
     def __iter__(self):
-        return (self.get(i).value for i in range(self.size))
+        current = self.first
+        while current:
+            yield current.value
+            current = current.next
 
     # iterates through the values
     def __next__(self):
@@ -45,9 +51,33 @@ class Queue:
     def __len__(self):
         return self.size
 
+    # O(1) membership check using the index. Unhashable values are not
+    # indexed so fall back to walking the nodes
+    def __contains__(self, value):
+        try:
+            return self.index.get(value, 0) > 0
+        except TypeError:
+            return any(v == value for v in self)
+
     #  Makes a list of all current values
     def all_values(self):
-        return [self.get(i).value for i in range(self.size)]
+        return list(self)
+
+    # add/ remove a value from the index - skips unhashable values
+    def _index_add(self, value):
+        try:
+            self.index[value] = self.index.get(value, 0) + 1
+        except TypeError:
+            pass
+
+    def _index_remove(self, value):
+        try:
+            if self.index[value] == 1:
+                del self.index[value]
+            else:
+                self.index[value] -= 1
+        except (KeyError, TypeError):
+            pass
 
     # add a new node to the end of the list
     def enqueue(self, value):
@@ -59,6 +89,7 @@ class Queue:
             self.last.next = new_node
             self.last = new_node
         self.size += 1
+        self._index_add(value)
 
         return self.size
 
@@ -73,6 +104,7 @@ class Queue:
 
         if self.size == 0:
             self.last = None
+        self._index_remove(old_first.value)
 
         return old_first.value
 
@@ -0,0 +1,75 @@
+# Search Stats - opt in counters for graph searches (bfs, dfs_iter,
+# dijkstra, astar) and the priority queues they use. Pass a SearchStats as
+# stats=... to record what a call did; leave it out (None) and nothing is
+# counted. One object can be passed to several calls - counts add up, peak
+# frontier keeps the largest and calls counts the searches made.
+# Uses: finding why a query is slow (e.g. a huge frontier or a heuristic
+# that expands as much as plain Dijkstra) without changing the library.
+import time
+
+
+class SearchStats:
+    """
+    Counters for graph searches. Optionally calls callback(stats) every time
+    a search finishes e.g. to log or export the numbers.
+    :return: Dict of the counters
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.reset()
+
+    def __repr__(self):
+        return f"{self.as_dict()}"
+
+    # set every counter back to 0
+    def reset(self):
+        self.calls = 0
+        # vertices taken off the frontier and explored
+        self.expanded = 0
+        # edges looked at from explored vertices
+        self.relaxed = 0
+        # frontier (queue/ stack/ heap) operations
+        self.pushes = 0
+        self.pops = 0
+        self.peak_frontier = 0
+        # wall time in seconds
+        self.seconds = 0.0
+        self._started = None
+
+    # returns the counters as a dict
+    def as_dict(self):
+        return {"calls": self.calls, "expanded": self.expanded,
+                "relaxed": self.relaxed, "pushes": self.pushes,
+                "pops": self.pops, "peak_frontier": self.peak_frontier,
+                "seconds": self.seconds}
+
+    # mark the start of a search
+    def start(self):
+        self.calls += 1
+        self._started = time.perf_counter()
+
+    # mark the end of a search - adds its wall time and calls the callback
+    def stop(self):
+        self.seconds += time.perf_counter() - self._started
+        self._started = None
+        if self.callback is not None:
+            self.callback(self)
+
+    # record a push onto a frontier which now holds size items
+    def pushed(self, size):
+        self.pushes += 1
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    # record the size of a frontier
+    def frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    # record a whole traversal at once - every vertex reached is pushed,
+    # popped and expanded exactly once (bfs, dfs_iter)
+    def traversal(self, vertices, edges):
+        self.expanded += vertices
+        self.pushes += vertices
+        self.pops += vertices
+        self.relaxed += edges
@@ -15,7 +15,8 @@ class Node:
 
 
 # Big O notation:
-# Insertion O(1), Removal O(1)->O(n), Searching O(n), Access(O(n).
+# Insertion O(1), Removal O(1)->O(n), Searching O(n) (O(1) for "in" checks
+# as values are indexed), Access(O(n).
 class Stack:
     """
     Last in, first out (LIFO) system. Create a non indexed node based list
@@ -26,13 +27,18 @@ class Stack:
         self.first = None
         self.last = None
         self.size = 0
+        # count of each value held - makes 'in' checks O(1)
+        self.index = {}
 
     def __repr__(self):
         return f"{self.all_values()}"
 
-    # return generated expression of values
+    # walk the nodes once returning each value - O(n) for a full pass
     def __iter__(self):
-        return (self.get(i).value for i in range(self.size))
+        current = self.first
+        while current:
+            yield current.value
+            current = current.next
 
     # iterates through the values
     def __next__(self):
@@ -48,9 +54,33 @@ class Stack:
     def __len__(self):
         return self.size
 
+    # O(1) membership check using the index. Unhashable values are not
+    # indexed so fall back to walking the nodes
+    def __contains__(self, value):
+        try:
+            return self.index.get(value, 0) > 0
+        except TypeError:
+            return any(v == value for v in self)
+
     #  Makes a list of all current values
     def all_values(self):
-        return [self.get(i).value for i in range(self.size)]
+        return list(self)
+
+    # add/ remove a value from the index - skips unhashable values
+    def _index_add(self, value):
+        try:
+            self.index[value] = self.index.get(value, 0) + 1
+        except TypeError:
+            pass
+
+    def _index_remove(self, value):
+        try:
+            if self.index[value] == 1:
+                del self.index[value]
+            else:
+                self.index[value] -= 1
+        except (KeyError, TypeError):
+            pass
 
     # add a new node to the start of the list
     def push(self, value):
@@ -62,6 +92,7 @@ class Stack:
             new_node.next = self.first
             self.first = new_node
         self.size += 1
+        self._index_add(value)
 
         return new_node.value
 
@@ -76,6 +107,7 @@ class Stack:
 
         if self.size == 0:
             self.last = None
+        self._index_remove(old_first.value)
 
         return old_first.value
 